@@ -0,0 +1,168 @@
+"""Fake Unipol Move API, answering the clients without network access"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from http.cookies import SimpleCookie
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+from requests.cookies import cookiejar_from_dict
+
+import unipolmove_client as u
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+CREDENTIALS = u.GatewayCredentials("movements-id", "movements-secret", "pdf-id", "pdf-secret")
+
+
+def make_movements(count: int, start: datetime = datetime(2024, 6, 30, 12, 0)) -> List[Dict[str, Any]]:
+    """Movements as returned by the API, newest first"""
+    movements = []
+    for index in range(count):
+        entry = start - timedelta(hours=7 * index)
+        movements.append({
+            "dataIngresso": entry.strftime("%Y-%m-%dT%H:%M:%S"),
+            "dataUscita": (entry + timedelta(minutes=35)).strftime("%Y-%m-%dT%H:%M:%S"),
+            "inizioTratta": ("MILANO", "ROMA", "TORINO")[index % 3],
+            "fineTratta": "BOLOGNA",
+            "saldo": round(1.5 + index % 7, 2),
+            "importoAddebitato": "%.2f" % (1.5 + index % 7),
+            "statoPagamento": "DA_ADDEBITARE" if index < 10 else "ADDEBITATO",
+            "targa": "AB%03dCD" % (index % 3),
+        })
+    return movements
+
+
+class FakeApi:
+    """
+    State of the fake portal: movements, valid sessions and the requests received
+
+    failures maps a movements offset to the (status, headers) answers sent, in
+    order, before the page itself.
+    """
+
+    def __init__(self, movements: List[Dict[str, Any]]):
+        self.movements = movements
+        self.sessions = set()
+        self.logins = 0
+        self.offsets: List[int] = []
+        self.pdf_bodies: List[bytes] = []
+        self.failures: Dict[int, List[Tuple[int, Dict[str, str]]]] = {}
+        self.lock = threading.Lock()
+
+    def handle(self, method: str, url: str, params: Dict[str, Any], session: Optional[str],
+               body: bytes) -> Tuple[int, Dict[str, str], bytes, Dict[str, str]]:
+        """Answer a request with (status, headers, content, cookies)"""
+        path = urlsplit(url).path
+        if method == "POST" and path == u.UnipolMoveClient.LOGIN_ENDPOINT:
+            with self.lock:
+                self.logins += 1
+                token = f"session-{self.logins}"
+                self.sessions.add(token)
+            return 200, {}, b"", {"MRHSession": token, "LastMRH_Session": "last"}
+        if method == "GET" and path.endswith("/movimenti"):
+            offset, limit = int(params["offset"]), int(params["limite"])
+            with self.lock:
+                self.offsets.append(offset)
+                failures = self.failures.get(offset)
+                if failures:
+                    status, headers = failures.pop(0)
+                    return status, headers, b'{"error":true}', {}
+            if session not in self.sessions:
+                return 401, {}, b'{"error":"auth"}', {}
+            page = {"dispositivi": [], "listaMovimenti": self.movements[offset - 1:offset - 1 + limit]}
+            return 200, {"Content-Type": "application/json"}, json.dumps(page).encode(), {}
+        if method == "POST" and path.endswith("/stampa"):
+            if session not in self.sessions:
+                return 401, {}, b'{"error":"auth"}', {}
+            self.pdf_bodies.append(body)
+            count = len(json.loads(body)["listaMovimenti"])
+            return 200, {"Content-Type": "application/pdf"}, b"%%PDF-fake %d" % count, {}
+        return 404, {}, b"", {}
+
+
+class FakeSession:
+    """Stands in for requests.Session, answering requests with a FakeApi"""
+
+    def __init__(self, api: FakeApi):
+        self.api = api
+
+    def request(self, method: str, url: str, params=None, data=None, cookies=None,
+                **kwargs) -> requests.Response:
+        if data is None or isinstance(data, dict):
+            body = b""
+        else:
+            body = b"".join(data)
+        session = (cookies or {}).get("MRHSession")
+        status, headers, content, set_cookies = self.api.handle(method, url, params or {},
+                                                                session, body)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response.url = url
+        response._content = content
+        response._content_consumed = True
+        response.cookies = cookiejar_from_dict(set_cookies)
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def async_transport(api: FakeApi) -> "httpx.MockTransport":
+    """httpx transport answering requests with a FakeApi"""
+
+    async def handler(request: "httpx.Request") -> "httpx.Response":
+        body = b""
+        async for chunk in request.stream:
+            body += chunk
+        cookie = SimpleCookie(request.headers.get("Cookie", ""))
+        session = cookie["MRHSession"].value if "MRHSession" in cookie else None
+        params = {key: values[0] for key, values in parse_qs(request.url.query.decode()).items()}
+        status, headers, content, set_cookies = api.handle(request.method, str(request.url),
+                                                           params, session, body)
+        headers = list(headers.items())
+        headers += [("Set-Cookie", f"{name}={value}; Path=/")
+                    for name, value in set_cookies.items()]
+        return httpx.Response(status, headers=headers, content=content)
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def api() -> FakeApi:
+    return FakeApi(make_movements(537))
+
+
+@pytest.fixture
+def client(api, tmp_path):
+    """Logged-in client of the fake API, with its caches under tmp_path"""
+    client = u.UnipolMoveClient("P000000000", http_session=FakeSession(api),
+                                credentials=CREDENTIALS, cache_dir=str(tmp_path),
+                                retry_policy=u.RetryPolicy(backoff_factor=0))
+    client.login("user", "password")
+    return client
+
+
+@pytest.fixture
+def async_client_factory(api):
+    """Build logged-out async clients of the fake API (call within an event loop)"""
+    if httpx is None:
+        pytest.skip("httpx is not installed")
+
+    def build(**kwargs) -> u.AsyncUnipolMoveClient:
+        kwargs.setdefault("cache_dir", None)
+        kwargs.setdefault("retry_policy", u.RetryPolicy(backoff_factor=0))
+        return u.AsyncUnipolMoveClient(
+            "P000000000", http_client=httpx.AsyncClient(transport=async_transport(api)),
+            credentials=CREDENTIALS, **kwargs
+        )
+
+    return build
@@ -0,0 +1,88 @@
+import pickle
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+import unipolmove_client as u
+
+from conftest import make_movements
+
+
+ROUND_TRIP_MOVEMENTS = [
+    {"dataIngresso": "2024-03-01T08:15:00", "dataUscita": "2024-03-01T09:00:00Z",
+     "saldo": 2.5, "importoAddebitato": "2.50", "inizioTratta": "MILANO",
+     "fineTratta": "BOLOGNA", "targa": "AB123CD", "idMovimento": 42},
+    {"dataIngresso": None, "dataUscita": "2024-03-02", "saldo": 3, "importoAddebitato": "3,10"},
+    {"dataIngresso": "", "saldo": -0.0, "importoAddebitato": 0.0},
+    {"dataIngresso": "not a date", "saldo": "n/a", "extra": {"nested": [1, 2]}},
+    {"saldo": 1e-7, "importoAddebitato": 1234567.891},
+    {"importoAddebitato": True, "inizioTratta": None},
+    {},
+]
+
+
+@pytest.mark.parametrize("movement", ROUND_TRIP_MOVEMENTS)
+def test_to_dict_round_trip(movement):
+    record = u.Movement.from_dict(movement)
+
+    restored = record.to_dict()
+
+    assert restored == movement
+    assert [(key, type(value)) for key, value in sorted(restored.items())] == \
+        [(key, type(value)) for key, value in sorted(movement.items())]
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+@pytest.mark.parametrize("movement", ROUND_TRIP_MOVEMENTS)
+def test_dictionary_access(movement):
+    record = u.Movement.from_dict(movement)
+
+    for key, value in movement.items():
+        assert key in record
+        assert record[key] == value
+        assert record.get(key) == value
+    assert "missing" not in record
+    assert record.get("missing", 0) == 0
+    with pytest.raises(KeyError):
+        record["missing"]
+
+
+def test_parsed_fields():
+    record = u.Movement.from_dict(ROUND_TRIP_MOVEMENTS[0])
+
+    assert record.data_ingresso == datetime(2024, 3, 1, 8, 15)
+    assert record.data_uscita == datetime(2024, 3, 1, 9, 0)
+    assert record.movement_datetime == record.data_ingresso
+    assert record.saldo == Decimal("2.5")
+    assert record.importo_addebitato == Decimal("2.50")
+    assert record.inizio_tratta == "MILANO"
+
+    fallback = u.Movement.from_dict(ROUND_TRIP_MOVEMENTS[1])
+    assert fallback.movement_datetime == datetime(2024, 3, 2)
+    assert fallback.importo_addebitato == Decimal("3.10")
+
+
+def test_records_share_extra_keys():
+    first, second = u.Movement.from_dicts(make_movements(2))
+    assert first._extra_keys is second._extra_keys
+
+
+def test_movement_identity_tells_devices_apart():
+    movement = make_movements(1)[0]
+    other_device = dict(movement, targa="ZZ999ZZ")
+
+    assert u.movement_identity(movement) != u.movement_identity(other_device)
+    assert u.movement_identity(movement) == u.movement_identity(u.Movement.from_dict(movement))
+
+
+def test_records_filter_like_dictionaries(client):
+    movements = make_movements(100)
+    records = u.Movement.from_dicts(movements)
+    start, end = datetime(2024, 6, 20).date(), datetime(2024, 6, 25).date()
+
+    filtered = client.filter_movements_by_date(records, start, end)
+
+    assert [record.to_dict() for record in filtered] == \
+        client.filter_movements_by_date(movements, start, end)
+    assert filtered
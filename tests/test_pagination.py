@@ -0,0 +1,163 @@
+import asyncio
+import time
+
+import pytest
+
+import unipolmove_client as u
+
+from conftest import make_movements
+
+
+def test_fetch_all_movements_pages(api, client):
+    assert client.fetch_all_movements(batch_size=100) == api.movements
+    assert api.offsets == [1, 101, 201, 301, 401, 501]
+
+
+def test_rate_limited_page_is_replayed_after_retry_after(api, client):
+    api.failures[101] = [(429, {"Retry-After": "0"}), (429, {"Retry-After": "0"})]
+
+    assert client.fetch_all_movements() == api.movements
+    assert api.offsets.count(101) == 3
+
+
+def test_retry_after_is_waited(api, client, monkeypatch):
+    waits = []
+    monkeypatch.setattr(u.time, "sleep", waits.append)
+    api.failures[1] = [(429, {"Retry-After": "2"})]
+
+    client.fetch_movements()
+
+    assert waits == [2.0]
+
+
+def test_rate_limit_retries_are_bounded(api, client):
+    client.max_rate_limit_retries = 1
+    api.failures[101] = [(429, {"Retry-After": "0"})] * 2
+
+    with pytest.raises(u.PaginationError) as excinfo:
+        client.fetch_all_movements()
+    assert excinfo.value.offset == 101
+
+
+def test_pagination_error_resume(api, client):
+    client.retry_policy = None
+    api.failures[201] = [(500, {})]
+
+    with pytest.raises(u.PaginationError) as excinfo:
+        client.fetch_all_movements()
+    error = excinfo.value
+    assert error.offset == 201
+    assert error.movements == api.movements[:200]
+
+    api.offsets.clear()
+    assert client.fetch_all_movements(resume_from=error) == api.movements
+    assert api.offsets[0] == 201
+
+
+def test_server_errors_are_retried(api, client):
+    api.failures[101] = [(503, {}), (502, {})]
+
+    assert client.fetch_all_movements() == api.movements
+    assert api.offsets.count(101) == 3
+
+
+def _interrupt_at(api, client, offset):
+    client.retry_policy = None
+    api.failures[offset] = [(500, {})]
+    with pytest.raises(u.PaginationError):
+        client.fetch_all_movements(checkpoint=True)
+    api.offsets.clear()
+
+
+def test_checkpoint_resume(api, client):
+    _interrupt_at(api, client, 301)
+
+    assert client.fetch_all_movements(checkpoint=True) == api.movements
+    # The last saved page is fetched again to check the history didn't shift
+    assert api.offsets == [201, 301, 401, 501]
+
+
+def test_checkpoint_restarts_when_saved_page_is_stale(api, client):
+    _interrupt_at(api, client, 301)
+    # New movements shift every page
+    api.movements = make_movements(3, u.datetime(2024, 7, 2)) + api.movements
+
+    assert client.fetch_all_movements(checkpoint=True) == api.movements
+    assert api.offsets == [201, 1, 101, 201, 301, 401, 501]
+
+
+def test_checkpoint_is_cleared_on_completion(api, client):
+    _interrupt_at(api, client, 301)
+    client.fetch_all_movements(checkpoint=True)
+    api.offsets.clear()
+
+    client.fetch_all_movements(checkpoint=True)
+
+    assert api.offsets[0] == 1
+
+
+def test_checkpoint_resume_returns_records(api, client):
+    client.movement_records = True
+    _interrupt_at(api, client, 101)
+
+    movements = client.fetch_all_movements(checkpoint=True)
+
+    assert all(isinstance(movement, u.Movement) for movement in movements)
+    assert [movement.to_dict() for movement in movements] == api.movements
+
+
+def test_stalled_request_times_out_and_is_retried(api, client, monkeypatch):
+    timeouts = []
+    request = client.http_session.request
+
+    def stall_once(method, url, **kwargs):
+        timeouts.append(kwargs["timeout"])
+        if len(timeouts) == 1:
+            raise u.requests.exceptions.ReadTimeout()
+        return request(method, url, **kwargs)
+
+    monkeypatch.setattr(client.http_session, "request", stall_once)
+
+    assert client.fetch_movements()["listaMovimenti"] == api.movements[:100]
+    assert timeouts == [u.DEFAULT_TIMEOUT] * 2
+
+
+def test_async_rate_limited_page_and_resume(api, async_client_factory):
+    api.failures[101] = [(429, {"Retry-After": "0"})]
+    api.failures[301] = [(500, {})]
+
+    async def main():
+        async with async_client_factory(retry_policy=None) as client:
+            await client.login("user", "password")
+            with pytest.raises(u.PaginationError) as excinfo:
+                await client.fetch_all_movements()
+            assert excinfo.value.movements == api.movements[:300]
+            return await client.fetch_all_movements(resume_from=excinfo.value)
+
+    started = time.monotonic()
+    assert asyncio.run(main()) == api.movements
+    assert api.offsets.count(101) == 2
+    assert time.monotonic() - started < 5
+
+
+def test_fetch_movements_between_rejects_uncovered_range(api, client):
+    start = u.date.today() - u.timedelta(days=400)
+
+    with pytest.raises(ValueError):
+        client.fetch_movements_between(start, u.date.today())
+    assert api.offsets == []
+
+
+@pytest.mark.skipif(u.msgspec is None, reason="msgspec is not installed")
+def test_projection_accepts_null_movement_list(client):
+    response = client._decode_movements(b'{"dispositivi":[],"listaMovimenti":null}',
+                                        u.CORE_FIELDS)
+
+    assert response["listaMovimenti"] is None
+
+
+def test_projection_keeps_only_given_fields(api, client):
+    movements = client.fetch_all_movements(fields=("saldo", "targa"))
+
+    assert movements == [{"saldo": movement["saldo"], "targa": movement["targa"]}
+                         for movement in api.movements]
@@ -0,0 +1,103 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+import unipolmove_client as u
+
+
+def _copied_payload(movements, intestatario):
+    """Body built the way reports were sent before _PdfPayload: copy each movement"""
+    copies = []
+    for idx, movement in enumerate(movements):
+        movement_copy = movement.to_dict() if isinstance(movement, u.Movement) \
+            else movement.copy()
+        movement_copy["checked"] = True
+        movement_copy["id"] = str(idx)
+        copies.append(movement_copy)
+    payload = {"intestatario": intestatario, "listaMovimenti": copies}
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+PAYLOAD_MOVEMENTS = [
+    {"dataIngresso": "2024-01-01T10:00:00", "saldo": 2.5, "inizioTratta": "CITTÀ"},
+    {},
+    {"saldo": 1, "id": "server-7", "note": None},
+    {"checked": False, "importoAddebitato": "3,10"},
+    {"nested": {"a": [1, 2.25, "x"]}, "dataUscita": "2024-01-01"},
+]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("chunk_size", [1, 64 * 1024])
+def test_pdf_payload_matches_copied_body(monkeypatch, use_orjson, chunk_size):
+    if not use_orjson:
+        monkeypatch.setattr(u, "orjson", None)
+    elif u.orjson is None:
+        pytest.skip("orjson is not installed")
+    movements = PAYLOAD_MOVEMENTS + [u.Movement.from_dict(PAYLOAD_MOVEMENTS[0])]
+    payload = u._PdfPayload(movements, "Mario Rössi", chunk_size=chunk_size)
+
+    body = b"".join(payload)
+
+    assert body == _copied_payload(movements, "Mario Rössi")
+    # Replayed requests iterate the body again
+    assert b"".join(payload) == body
+
+
+def test_pdf_payload_leaves_movements_untouched():
+    movements = [dict(movement) for movement in PAYLOAD_MOVEMENTS]
+    b"".join(u._PdfPayload(movements, "X"))
+    assert movements == PAYLOAD_MOVEMENTS
+
+
+def test_generate_pdf_report_sends_payload(api, client):
+    movements = api.movements[:3]
+
+    content = client.generate_pdf_report(movements, "Mario Rossi")
+
+    assert content == b"%PDF-fake 3"
+    assert json.loads(api.pdf_bodies[-1]) == json.loads(_copied_payload(movements, "Mario Rossi"))
+
+
+def test_download_pdf_report_streams_cached_report(api, client, tmp_path):
+    client.pdf_cache = u.PdfReportCache(str(tmp_path / "pdf"))
+    movements = api.movements[:3]
+    first = client.download_pdf_report(movements, "Mario Rossi", str(tmp_path / "a.pdf"))
+    requests_sent = len(api.pdf_bodies)
+
+    buffer = io.BytesIO()
+    second = client.download_pdf_report(movements, "Mario Rossi", buffer, chunk_size=4)
+
+    assert len(api.pdf_bodies) == requests_sent
+    assert buffer.getvalue() == (tmp_path / "a.pdf").read_bytes()
+    assert (second.size, second.sha256) == (first.size, first.sha256)
+
+
+def test_pdf_cache_evicts_only_its_reports(tmp_path):
+    own_file = tmp_path / "statement.pdf"
+    own_file.write_bytes(b"x" * 500)
+    cache = u.PdfReportCache(str(tmp_path), max_bytes=1000)
+    keys = [cache.key("P", str(index), []) for index in range(3)]
+
+    for _ in range(3):
+        cache.put(keys[0], b"a" * 300)
+    cache.put(keys[1], b"b" * 300)
+    cache.put(keys[2], b"c" * 500)
+
+    assert own_file.exists()
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == b"c" * 500
+
+
+def test_async_generate_pdf_report_sends_payload(api, async_client_factory):
+    movements = api.movements[:5]
+
+    async def main():
+        async with async_client_factory() as client:
+            await client.login("user", "password")
+            return await client.generate_pdf_report(movements, "Mario Rossi")
+
+    assert asyncio.run(main()) == b"%PDF-fake 5"
+    assert api.pdf_bodies[-1] == _copied_payload(movements, "Mario Rossi")
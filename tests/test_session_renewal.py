@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+import unipolmove_client as u
+
+from conftest import FakeSession
+
+
+def test_concurrent_auth_failures_log_in_once(api, client):
+    credentials_asked = []
+
+    def provider():
+        credentials_asked.append(True)
+        return "user", "password"
+
+    client.credential_provider = provider
+    api.sessions.clear()
+    # The first pages are all sent with the expired session, and their 401 answers
+    # arrive one after the other, after the first one already renewed the session
+    barrier = threading.Barrier(4, timeout=5)
+    handle = api.handle
+
+    def handle_together(method, url, params, session, body):
+        answer = handle(method, url, params, session, body)
+        if answer[0] == 401:
+            time.sleep(0.05 * barrier.wait())
+        return answer
+
+    api.handle = handle_together
+    logins = api.logins
+
+    movements = client.fetch_all_movements(batch_size=50, concurrency=4)
+
+    assert movements == api.movements
+    assert api.logins - logins == 1
+    assert len(credentials_asked) == 1
+
+
+def test_sibling_client_adopts_renewed_session(api, client):
+    client.credential_provider = lambda: ("user", "password")
+    other = client.for_contract("P000000001")
+    api.sessions.clear()
+    client.fetch_movements()
+    logins = api.logins
+
+    other.fetch_movements()
+
+    assert api.logins == logins
+    assert other.mrh_session == client.mrh_session
+
+
+def test_auth_failure_without_provider_is_returned(api, client):
+    api.sessions.clear()
+    with pytest.raises(requests.exceptions.HTTPError) as excinfo:
+        client.fetch_movements()
+    assert excinfo.value.response.status_code == 401
+
+
+def test_async_concurrent_auth_failures_log_in_once(api, async_client_factory):
+    async def main():
+        async with async_client_factory(
+                credential_provider=lambda: ("user", "password")) as client:
+            await client.login("user", "password")
+            api.sessions.clear()
+            logins = api.logins
+            # Hold the expired-session answers until all first pages have one
+            stalled = []
+            released = asyncio.Event()
+            handler = client.http_client._transport.handler
+
+            async def handle_together(request):
+                response = await handler(request)
+                if response.status_code == 401:
+                    stalled.append(request)
+                    if len(stalled) == 4:
+                        released.set()
+                    await asyncio.wait_for(released.wait(), 5)
+                return response
+
+            client.http_client._transport.handler = handle_together
+            movements = await client.fetch_all_movements(batch_size=50, concurrency=4)
+            return movements, api.logins - logins
+
+    movements, logins = asyncio.run(main())
+    assert movements == api.movements
+    assert logins == 1
+
+
+def test_login_stores_cookies(api):
+    client = u.UnipolMoveClient("P000000000", http_session=FakeSession(api), cache_dir=None)
+    assert client.login("user", "password")
+    assert client.mrh_session in api.sessions
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import sqlite3
+
+import pytest
+
+import unipolmove_client as u
+
+from conftest import make_movements
+
+
+STORES = [
+    lambda tmp_path: u.JsonMovementStore(str(tmp_path / "movements.json")),
+    lambda tmp_path: u.SQLiteMovementStore(str(tmp_path / "movements.db")),
+]
+
+
+def _old_identity(movement):
+    """movement_identity before devices and movement ids were part of it"""
+    key = json.dumps([movement.get(field) for field in u.IDENTITY_FIELDS], sort_keys=True)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+@pytest.mark.parametrize("make_store", STORES)
+def test_store_keeps_movements_of_different_devices(tmp_path, make_store):
+    movement = make_movements(1)[0]
+    fleet = [movement, dict(movement, targa="ZZ999ZZ")]
+    store = make_store(tmp_path)
+
+    assert store.merge("P", fleet) == 2
+    assert store.merge("P", fleet) == 0
+    assert len(store.movements("P")) == 2
+
+
+def test_json_store_rekeys_old_identities(tmp_path):
+    movement = make_movements(1)[0]
+    path = tmp_path / "movements.json"
+    path.write_text(json.dumps({"contracts": {"P": {
+        "high_water_mark": None, "movements": {_old_identity(movement): movement}}}}))
+
+    store = u.JsonMovementStore(str(path))
+
+    assert store.merge("P", [movement, dict(movement, targa="ZZ999ZZ")]) == 1
+
+
+def test_sqlite_store_rekeys_old_identities(tmp_path):
+    movement = make_movements(1)[0]
+    path = str(tmp_path / "movements.db")
+    with u.SQLiteMovementStore(path) as store:
+        store.merge("P", [movement])
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("UPDATE movements SET identity = ?", (_old_identity(movement),))
+        connection.execute("PRAGMA user_version = 0")
+    connection.close()
+
+    with u.SQLiteMovementStore(path) as store:
+        assert store.merge("P", [movement, dict(movement, targa="ZZ999ZZ")]) == 1
+
+
+def test_custom_movement_fields(tmp_path):
+    fields = u.MovementFields(device=("obu",), payment_status="stato")
+    movements = [dict(movement, obu=movement.pop("targa"), stato="X")
+                 for movement in make_movements(6)]
+
+    with u.SQLiteMovementStore(str(tmp_path / "movements.db"), movement_fields=fields) as store:
+        store.merge("P", movements)
+        totals = store.totals_by_device("P", payment_status="X")
+
+    assert sorted(totals) == ["AB000CD", "AB001CD", "AB002CD"]
@@ -4,31 +4,3082 @@ Unipol Move API Client Library
 Provides programmatic access to Unipol Move API for toll movements and expense reports
 """
 
+import asyncio
+import base64
+import bisect
+import copy
+import email.utils
+import functools
+import hashlib
+import inspect
+import io
 import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
 import uuid
-from datetime import datetime, date
-from typing import List, Dict, Any, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import (AsyncIterator, BinaryIO, Callable, Dict, Any, Iterable, Iterator, List,
+                    NamedTuple, FrozenSet, Optional, Tuple, TypedDict, Union)
 import requests
+from requests.adapters import HTTPAdapter
 
+try:
+    import httpx
+except ImportError:  # Optional dependency, only needed by AsyncUnipolMoveClient
+    httpx = None
 
-class UnipolMoveClient:
+try:
+    import numpy as np
+except ImportError:  # Optional dependency, only needed by MovementTable
+    np = None
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, speeds up JSON encoding and decoding
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Optional dependency, speeds up JSON decoding
+    msgspec = None
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # Optional dependency, only needed to merge split PDF reports
+    PdfReader = PdfWriter = None
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # Optional dependency, only needed by the session cache
+    Fernet = InvalidToken = None
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Default directory for on-disk caches (gateway credentials, ...)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "unipolmove")
+
+# How long resolved gateway credentials are considered fresh, in seconds
+CREDENTIALS_TTL = 24 * 60 * 60
+
+# Seconds to wait for the server to connect or send data before a request times out
+# (and is retried according to the retry policy)
+DEFAULT_TIMEOUT = 60.0
+
+# Decodes a JSON response body (bytes); all of them raise ValueError on invalid JSON
+JsonDecoder = Callable[[bytes], Any]
+
+# Fastest JSON decoder installed: orjson, msgspec or the json module
+if orjson is not None:
+    DEFAULT_JSON_DECODER: JsonDecoder = orjson.loads
+elif msgspec is not None:
+    DEFAULT_JSON_DECODER = msgspec.json.decode
+else:
+    DEFAULT_JSON_DECODER = json.loads
+
+
+class GatewayCredentials(NamedTuple):
+    """IBM API Gateway client id/secret pairs published in environment.json"""
+
+    movements_client_id: str
+    movements_client_secret: str
+    pdf_client_id: str
+    pdf_client_secret: str
+
+    @classmethod
+    def from_env_config(cls, env_config: Dict[str, Any]) -> "GatewayCredentials":
+        """Extract the credentials from a parsed environment.json document"""
+        movements = env_config['apiConnect']['headers_ut_prv_mobility_service']
+        pdf = env_config['apiConnect']['headers_us']
+        return cls(
+            movements_client_id=movements['x-ibm-client-id'],
+            movements_client_secret=movements['x-ibm-client-secret'],
+            pdf_client_id=pdf['x-ibm-client-id'],
+            pdf_client_secret=pdf['x-ibm-client-secret'],
+        )
+
+
+# Process-wide credentials cache: base URL -> (fetched_at, credentials)
+_credentials_cache: Dict[str, Tuple[float, GatewayCredentials]] = {}
+_credentials_lock = threading.Lock()
+
+
+def _credentials_cache_file(cache_dir: str, base_url: str) -> str:
+    digest = hashlib.sha256(base_url.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"credentials-{digest}.json")
+
+
+def _load_cached_credentials(base_url: str, ttl: float,
+                             cache_dir: Optional[str]) -> Optional[GatewayCredentials]:
+    """Return fresh credentials from the in-memory or on-disk cache, if any"""
+    now = time.time()
+    cached = _credentials_cache.get(base_url)
+    if cached and now - cached[0] < ttl:
+        return cached[1]
+
+    if not cache_dir:
+        return None
+    try:
+        with open(_credentials_cache_file(cache_dir, base_url), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        fetched_at = float(data['fetched_at'])
+        credentials = GatewayCredentials(**data['credentials'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if now - fetched_at >= ttl:
+        return None
+    _credentials_cache[base_url] = (fetched_at, credentials)
+    return credentials
+
+
+def _store_credentials(base_url: str, credentials: GatewayCredentials,
+                       cache_dir: Optional[str]) -> None:
+    """Save credentials to the in-memory cache and, best effort, to disk"""
+    fetched_at = time.time()
+    _credentials_cache[base_url] = (fetched_at, credentials)
+
+    if not cache_dir:
+        return
+    try:
+        _write_json_atomic(_credentials_cache_file(cache_dir, base_url),
+                           {"fetched_at": fetched_at, "credentials": credentials._asdict()})
+    except OSError:
+        # The disk cache is an optimization only
+        pass
+
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    """Write JSON to path through a temporary file, so readers never see partial data"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class SessionCache:
+    """
+    Session cookies of a username and contract, encrypted on disk and shared by
+    the processes logging in with them
+
+    The encryption key is derived from the password with PBKDF2, so reading the
+    cached session requires the same credentials as logging in. A lock file
+    serializes the processes, so that parallel workers share a single login.
+    """
+
+    KDF_ITERATIONS = 100_000
+
+    def __init__(self, cache_dir: str, base_url: str, contract_id: str,
+                 username: str, password: str):
+        """
+        Args:
+            cache_dir: Directory of the on-disk caches
+            base_url: Portal the session belongs to
+            contract_id: Contract the session is used for
+            username: Username the session was obtained with
+            password: Password the session was obtained with
+        """
+        if Fernet is None:
+            raise ImportError("The session cache requires cryptography: pip install cryptography")
+        key = "|".join((base_url, username, contract_id))
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, "sessions", f"session-{digest}.json")
+        self._password = password.encode("utf-8")
+        self._lock_file = None
+
+    def _fernet(self, salt: bytes) -> "Fernet":
+        key = hashlib.pbkdf2_hmac("sha256", self._password, salt, self.KDF_ITERATIONS)
+        return Fernet(base64.urlsafe_b64encode(key))
+
+    def acquire(self) -> None:
+        """Wait until no other process or thread holds the lock, and take it"""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        lock_file = open(self.path + ".lock", 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after 10 seconds
+                        pass
+        except BaseException:
+            lock_file.close()
+            raise
+        self._lock_file = lock_file
+
+    def release(self) -> None:
+        """Release the lock taken by acquire()"""
+        lock_file, self._lock_file = self._lock_file, None
+        if lock_file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            lock_file.close()
+
+    def load(self) -> Optional[Dict[str, str]]:
+        """
+        Read the cached session
+
+        Returns:
+            Dictionary with MRHSession, LastMRH_Session and session_id, or None if
+            there is no session or it can't be decrypted with this password
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            salt = base64.b64decode(data["salt"])
+            plaintext = self._fernet(salt).decrypt(data["token"].encode("ascii"))
+            session = json.loads(plaintext)
+            return {name: session[name]
+                    for name in ("MRHSession", "LastMRH_Session", "session_id")}
+        except (OSError, ValueError, KeyError, TypeError, InvalidToken):
+            return None
+
+    def store(self, mrh_session: str, last_mrh_session: str, session_id: str) -> None:
+        """Save the session, best effort"""
+        salt = os.urandom(16)
+        session = {"MRHSession": mrh_session, "LastMRH_Session": last_mrh_session,
+                   "session_id": session_id}
+        token = self._fernet(salt).encrypt(json.dumps(session).encode("utf-8"))
+        try:
+            _write_json_atomic(self.path, {"salt": base64.b64encode(salt).decode("ascii"),
+                                           "token": token.decode("ascii")})
+            os.chmod(self.path, 0o600)
+        except OSError:
+            # The disk cache is an optimization only
+            pass
+
+
+# Fields identifying a movement across fetches (payment status may change over time),
+# together with its device and server-side id, if any
+IDENTITY_FIELDS = ("dataIngresso", "dataUscita", "inizioTratta", "fineTratta", "saldo")
+
+# Movement fields that may hold a server-side movement id, first match wins. The API
+# does not document one, so these are the likely names; missing ones are ignored.
+MOVEMENT_ID_FIELDS = ("idMovimento", "id")
+
+# Bumped whenever movement_identity() changes, so that stores re-key what they hold
+IDENTITY_VERSION = 2
+
+
+def _parse_datetime_value(value: Any) -> Optional[datetime]:
+    """
+    Parse a movement date string
+
+    Returns:
+        Naive datetime with the wall-clock time found in the record, or None if missing
+        or unparseable
+    """
+    if not value:
+        return None
+    try:
+        # Handle various date formats
+        if "T" in value:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+        return datetime.strptime(value, "%Y-%m-%d")
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def _parse_movement_datetime(movement: Dict[str, Any]) -> Optional[datetime]:
+    """Parse the movement date, trying dataIngresso first and falling back to dataUscita"""
+    if isinstance(movement, Movement):
+        return movement.movement_datetime
+    return _parse_datetime_value(movement.get("dataIngresso") or movement.get("dataUscita", ""))
+
+
+# Movement fields holding the device (plate / OBU code), first match wins
+DEVICE_FIELDS = ("targa", "numeroDispositivo", "codiceDispositivo")
+PAYMENT_STATUS_FIELD = "statoPagamento"
+
+
+def _first_value(movement: Dict[str, Any], fields: Tuple[str, ...]) -> Optional[str]:
+    """First non-empty value of the given fields, as a string"""
+    for field in fields:
+        value = movement.get(field)
+        if value:
+            return str(value)
+    return None
+
+
+class MovementFields:
+    """
+    Names of the movement fields holding the device, payment status and movement id
+
+    The movements API documents none of them: the device is listed per contract in
+    'dispositivi', whose entries are not tied to movements by any documented key.
+    The defaults are the likely field names; pass the ones your movements actually
+    use to movement_identity, the stores, MovementTable and summarize_movements.
+    A movement without any of the device fields has device None.
+    """
+
+    def __init__(self, device: Tuple[str, ...] = DEVICE_FIELDS,
+                 payment_status: str = PAYMENT_STATUS_FIELD,
+                 movement_id: Tuple[str, ...] = MOVEMENT_ID_FIELDS):
+        """
+        Args:
+            device: Fields holding the device (plate / OBU code), first non-empty wins
+                    (default: DEVICE_FIELDS)
+            payment_status: Field holding the payment status (default: 'statoPagamento')
+            movement_id: Fields holding a server-side movement id, first non-empty wins
+                         (default: MOVEMENT_ID_FIELDS)
+        """
+        self.device = tuple(device)
+        self.payment_status = payment_status
+        self.movement_id = tuple(movement_id)
+
+    def device_of(self, movement: Dict[str, Any]) -> Optional[str]:
+        """Device of a movement, or None if it has none of the device fields"""
+        return _first_value(movement, self.device)
+
+    def payment_status_of(self, movement: Dict[str, Any]) -> Optional[str]:
+        return movement.get(self.payment_status)
+
+    def movement_id_of(self, movement: Dict[str, Any]) -> Optional[str]:
+        return _first_value(movement, self.movement_id)
+
+    @property
+    def core(self) -> Tuple[str, ...]:
+        """
+        Movement fields most consumers need, for field projection: identity (dates,
+        route, saldo, id), charged amount, payment status and device
+        """
+        return IDENTITY_FIELDS + self.movement_id + ("importoAddebitato", self.payment_status) \
+            + self.device
+
+
+DEFAULT_MOVEMENT_FIELDS = MovementFields()
+
+# Core fields of the default MovementFields, see MovementFields.core
+CORE_FIELDS = DEFAULT_MOVEMENT_FIELDS.core
+
+
+def movement_identity(movement: Dict[str, Any],
+                      movement_fields: MovementFields = DEFAULT_MOVEMENT_FIELDS) -> str:
+    """
+    Stable identity of a movement, built from its server-side id, its device and
+    IDENTITY_FIELDS
+
+    The device keeps apart movements of fleet vehicles passing the same toll at the
+    same time for the same amount.
+
+    Args:
+        movement: Movement dictionary or Movement record
+        movement_fields: Names of the id and device fields (default: DEFAULT_MOVEMENT_FIELDS)
+    """
+    key = [movement_fields.movement_id_of(movement), movement_fields.device_of(movement)]
+    key.extend(movement.get(field) for field in IDENTITY_FIELDS)
+    key = json.dumps(key, sort_keys=True, default=str)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _parse_amount(value: Any) -> Optional[Decimal]:
+    """Parse an amount given as a JSON number or string (with '.' or ',' decimals)"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        value = repr(value)
+    try:
+        return Decimal(str(value).strip().replace(",", "."))
+    except InvalidOperation:
+        return None
+
+
+def _movement_amount(movement: Dict[str, Any]) -> Optional[Decimal]:
+    """Charged amount of a movement, falling back to its balance"""
+    if isinstance(movement, Movement):
+        amount, balance = movement.importo_addebitato, movement.saldo
+    else:
+        amount = _parse_amount(movement.get("importoAddebitato"))
+        balance = _parse_amount(movement.get("saldo"))
+    return amount if amount is not None else balance
+
+
+class _Format:
+    """Renders a parsed Movement field back to its original JSON value"""
+
+    __slots__ = ("render",)
+
+    def __init__(self, render):
+        self.render = render
+
+
+_DATE_FORMATS = (
+    _Format(datetime.isoformat),
+    _Format(lambda value: value.isoformat() + "Z"),
+    _Format(lambda value: value.strftime("%Y-%m-%d")),
+)
+_AMOUNT_FORMATS = (_Format(float), _Format(str), _Format(int))
+_STATION = _Format(None)
+
+# Marks fields absent from the source dictionary of a Movement
+_MISSING = object()
+
+# Shared _raw tuples of Movement records (most records use the same formats)
+_raw_formats: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+
+# Shared key tuples of the other fields of Movement records (most records have the same)
+_extra_keys: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+# Shared parsed amounts, keyed by source type and value: toll amounts repeat across
+# movements and a Decimal is several times larger than the float it comes from
+_amounts: Dict[Tuple[type, Any], Optional[Decimal]] = {}
+_AMOUNTS_MAX_SIZE = 4096
+
+
+def _shared_amount(value: Any) -> Optional[Decimal]:
+    """Parse an amount, reusing the Decimal of an earlier identical value"""
+    # Floats by repr, which tells -0.0 from 0.0
+    key = (type(value), repr(value) if isinstance(value, float) else value)
+    try:
+        return _amounts[key]
+    except KeyError:
+        amount = _parse_amount(value)
+    except TypeError:
+        # Unhashable value
+        return _parse_amount(value)
+    if len(_amounts) < _AMOUNTS_MAX_SIZE:
+        _amounts[key] = amount
+    return amount
+
+
+def _compact_value(value: Any, parsed: Any, formats: Tuple[_Format, ...]) -> Any:
+    """Return the format reproducing value from parsed, or value itself if none does"""
+    if parsed is not None:
+        for fmt in formats:
+            rendered = fmt.render(parsed)
+            if type(rendered) is type(value) and rendered == value:
+                return fmt
+    return value
+
+
+def _intern_short(value: Any) -> Any:
+    """Intern short strings such as codes and plates, which repeat across movements"""
+    if isinstance(value, str) and len(value) <= 32:
+        return sys.intern(value)
+    return value
+
+
+class Movement:
+    """
+    Compact toll movement record with pre-parsed fields
+
+    Dates are parsed once into naive datetimes, amounts into Decimal and station
+    names are interned. Only the format of the parsed fields is remembered (or
+    their source value, when it can't be rendered back exactly), so to_dict()
+    returns a dictionary equal to the one the record was built from, as expected
+    by the PDF endpoint. The other fields are kept as a tuple of values next to
+    a key tuple shared by records with the same fields. Movements can be passed
+    wherever movement dictionaries are accepted, and support read-only dictionary
+    access through get() and [].
+    """
+
+    __slots__ = ("data_ingresso", "data_uscita", "movement_datetime", "saldo",
+                 "importo_addebitato", "inizio_tratta", "fine_tratta", "_raw", "_extra_keys",
+                 "_extra_values")
+
+    # Source fields of the parsed attributes, in the order they are kept in _raw
+    FIELDS = ("dataIngresso", "dataUscita", "saldo", "importoAddebitato",
+              "inizioTratta", "fineTratta")
+    _ATTRIBUTES = ("data_ingresso", "data_uscita", "saldo", "importo_addebitato",
+                   "inizio_tratta", "fine_tratta")
+
+    def __init__(self, data_ingresso: Optional[datetime], data_uscita: Optional[datetime],
+                 movement_datetime: Optional[datetime], saldo: Optional[Decimal],
+                 importo_addebitato: Optional[Decimal], inizio_tratta: Optional[str],
+                 fine_tratta: Optional[str], raw: Tuple[Any, ...],
+                 extra_keys: Tuple[str, ...], extra_values: Tuple[Any, ...]):
+        self.data_ingresso = data_ingresso
+        self.data_uscita = data_uscita
+        self.movement_datetime = movement_datetime
+        self.saldo = saldo
+        self.importo_addebitato = importo_addebitato
+        self.inizio_tratta = inizio_tratta
+        self.fine_tratta = fine_tratta
+        self._raw = raw
+        self._extra_keys = extra_keys
+        self._extra_values = extra_values
+
+    @classmethod
+    def from_dict(cls, movement: Dict[str, Any]) -> "Movement":
+        """Build a record from a movement dictionary returned by the API"""
+        entry, exit_, balance, amount, start, end = (
+            movement.get(field, _MISSING) for field in cls.FIELDS
+        )
+        data_ingresso = _parse_datetime_value(entry) if entry is not _MISSING else None
+        data_uscita = _parse_datetime_value(exit_) if exit_ is not _MISSING else None
+        saldo = _shared_amount(balance) if balance is not _MISSING else None
+        importo_addebitato = _shared_amount(amount) if amount is not _MISSING else None
+
+        # Same fallback rule as _parse_movement_datetime
+        if entry is not _MISSING and entry:
+            movement_datetime = data_ingresso
+        else:
+            movement_datetime = data_uscita if exit_ is not _MISSING else None
+
+        raw = (
+            _compact_value(entry, data_ingresso, _DATE_FORMATS),
+            _compact_value(exit_, data_uscita, _DATE_FORMATS),
+            _compact_value(balance, saldo, _AMOUNT_FORMATS),
+            _compact_value(amount, importo_addebitato, _AMOUNT_FORMATS),
+            _MISSING if start is _MISSING else _STATION,
+            _MISSING if end is _MISSING else _STATION,
+        )
+        if all(isinstance(value, _Format) or value is _MISSING or value is None
+               for value in raw):
+            raw = _raw_formats.setdefault(raw, raw)
+
+        # Station names repeat across the whole history
+        if isinstance(start, str):
+            start = sys.intern(start)
+        if isinstance(end, str):
+            end = sys.intern(end)
+
+        # Other fields are kept as a key tuple shared by records with the same fields
+        # and a tuple of values, a fraction of the size of a dictionary per record
+        extra_keys = tuple(key for key in movement if key not in cls.FIELDS)
+        extra_keys = _extra_keys.get(extra_keys) or _extra_keys.setdefault(
+            extra_keys, tuple(sys.intern(key) for key in extra_keys)
+        )
+        extra_values = tuple(_intern_short(movement[key]) for key in extra_keys)
+        return cls(
+            data_ingresso=data_ingresso,
+            data_uscita=data_uscita,
+            movement_datetime=movement_datetime,
+            saldo=saldo,
+            importo_addebitato=importo_addebitato,
+            inizio_tratta=None if start is _MISSING else start,
+            fine_tratta=None if end is _MISSING else end,
+            raw=raw,
+            extra_keys=extra_keys,
+            extra_values=extra_values,
+        )
+
+    @classmethod
+    def from_dicts(cls, movements: List[Dict[str, Any]]) -> List["Movement"]:
+        """Build records from a list of movement dictionaries"""
+        return [cls.from_dict(movement) for movement in movements]
+
+    def _source_value(self, index: int) -> Any:
+        value = self._raw[index]
+        if value is _STATION:
+            return getattr(self, self._ATTRIBUTES[index])
+        if isinstance(value, _Format):
+            return value.render(getattr(self, self._ATTRIBUTES[index]))
+        return value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the movement dictionary the record was built from"""
+        movement = {field: self._source_value(index)
+                    for index, field in enumerate(self.FIELDS)
+                    if self._raw[index] is not _MISSING}
+        movement.update(zip(self._extra_keys, self._extra_values))
+        return movement
+
+    @property
+    def date(self) -> Optional[date]:
+        """Movement date (dataIngresso, falling back to dataUscita)"""
+        return self.movement_datetime.date() if self.movement_datetime else None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            index = self.FIELDS.index(key)
+            if self._raw[index] is _MISSING:
+                raise KeyError(key)
+            return self._source_value(index)
+        try:
+            return self._extra_values[self._extra_keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __reduce__(self):
+        # Formats hold lambdas, so records are pickled (e.g. to worker processes) as dicts
+        return Movement.from_dict, (self.to_dict(),)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Movement):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return (f"Movement({self.movement_datetime!r}, {self.inizio_tratta!r} -> "
+                f"{self.fine_tratta!r}, {self.importo_addebitato!r})")
+
+
+def _as_dict(movement: Dict[str, Any]) -> Dict[str, Any]:
+    """Movement dictionary for a movement dictionary or Movement record"""
+    return movement.to_dict() if isinstance(movement, Movement) else movement
+
+
+class MovementDateIndex:
+    """
+    Movements sorted by date, for repeated date range queries
+
+    Built once in O(n log n), each query then costs O(log n + k). Dates follow the
+    filter_movements_by_date rule (dataIngresso, falling back to dataUscita), and
+    movements without a parseable date are left out.
+    """
+
+    def __init__(self, movements: List[Dict[str, Any]]):
+        """
+        Args:
+            movements: List of movement dictionaries or Movement records
+        """
+        dated = []
+        for movement in movements:
+            movement_datetime = _parse_movement_datetime(movement)
+            if movement_datetime is not None:
+                dated.append((movement_datetime.date(), movement))
+        # sorted() is stable: movements of the same day keep their original order
+        dated.sort(key=lambda item: item[0])
+        self._dates = [movement_date for movement_date, _ in dated]
+        self._movements = [movement for _, movement in dated]
+
+    def __len__(self) -> int:
+        return len(self._movements)
+
+    def between(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """
+        Movements within a date range
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+
+        Returns:
+            Same movements as filter_movements_by_date, oldest first
+        """
+        low = bisect.bisect_left(self._dates, start_date)
+        high = bisect.bisect_right(self._dates, end_date, lo=low)
+        return self._movements[low:high]
+
+
+class MovementSummary(NamedTuple):
+    """Number of movements and total charged amount of a group"""
+
+    count: int
+    total: Decimal
+
+
+def _movement_month(movement: Dict[str, Any]) -> Optional[date]:
+    movement_datetime = _parse_movement_datetime(movement)
+    return movement_datetime.date().replace(day=1) if movement_datetime else None
+
+
+# Grouping keys available to summarize_movements
+SUMMARY_GROUPS: Dict[str, Callable[[Dict[str, Any], MovementFields], Any]] = {
+    "device": lambda movement, fields: fields.device_of(movement),
+    "payment_status": lambda movement, fields: fields.payment_status_of(movement),
+    "inizio_tratta": lambda movement, fields: movement.get("inizioTratta"),
+    "fine_tratta": lambda movement, fields: movement.get("fineTratta"),
+    "month": lambda movement, fields: _movement_month(movement),
+}
+
+
+def _summarize_shard(movements: List[Dict[str, Any]], group_by: str,
+                     start_date: Optional[date],
+                     end_date: Optional[date],
+                     movement_fields: MovementFields) -> Dict[Any, MovementSummary]:
+    """Parse, filter and aggregate one shard of movements (runs in a worker process)"""
+    group_key = SUMMARY_GROUPS[group_by]
+    counts: Dict[Any, int] = {}
+    totals: Dict[Any, Decimal] = {}
+    for movement in movements:
+        if start_date is not None or end_date is not None:
+            movement_datetime = _parse_movement_datetime(movement)
+            if movement_datetime is None:
+                continue
+            movement_date = movement_datetime.date()
+            if (start_date is not None and movement_date < start_date) or \
+                    (end_date is not None and movement_date > end_date):
+                continue
+        key = group_key(movement, movement_fields)
+        counts[key] = counts.get(key, 0) + 1
+        totals[key] = totals.get(key, Decimal(0)) + (_movement_amount(movement) or Decimal(0))
+    return {key: MovementSummary(counts[key], totals[key]) for key in counts}
+
+
+def _merge_summaries(summaries: Dict[Any, MovementSummary],
+                     shard: Dict[Any, MovementSummary]) -> None:
+    for key, summary in shard.items():
+        previous = summaries.get(key)
+        if previous is not None:
+            summary = MovementSummary(previous.count + summary.count,
+                                      previous.total + summary.total)
+        summaries[key] = summary
+
+
+def summarize_movements(movements: Iterable[Dict[str, Any]],
+                        group_by: str = "device",
+                        start_date: Optional[date] = None,
+                        end_date: Optional[date] = None,
+                        max_workers: Optional[int] = None,
+                        chunk_size: int = 5000,
+                        movement_fields: MovementFields = DEFAULT_MOVEMENT_FIELDS
+                        ) -> Dict[Any, MovementSummary]:
+    """
+    Count and total movements per group, sharding the work across worker processes
+
+    Movements are consumed from the iterable in the calling thread, so it can be a
+    live stream such as client.iter_movements(prefetch=2): network I/O stays in
+    this thread while parsing, filtering and aggregation of each shard runs in a
+    ProcessPoolExecutor. At most two shards per worker are held in flight.
+
+    Args:
+        movements: Movement dictionaries or Movement records, e.g. of several contracts
+        group_by: Grouping key, one of SUMMARY_GROUPS (default: 'device')
+        start_date: Only count movements from this date (inclusive, default: no limit)
+        end_date: Only count movements until this date (inclusive, default: no limit)
+        max_workers: Number of worker processes (default: number of CPUs)
+        chunk_size: Number of movements per shard (default: 5000)
+        movement_fields: Names of the device and payment status fields
+                         (default: DEFAULT_MOVEMENT_FIELDS)
+
+    Returns:
+        Dictionary mapping each group to its MovementSummary (count, total importoAddebitato,
+        falling back to saldo)
+    """
+    if group_by not in SUMMARY_GROUPS:
+        raise ValueError(f"Unknown group: {group_by!r}")
+    workers = max_workers or os.cpu_count() or 1
+    summaries: Dict[Any, MovementSummary] = {}
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shard = []
+        for movement in movements:
+            shard.append(movement)
+            if len(shard) < chunk_size:
+                continue
+            pending.append(executor.submit(_summarize_shard, shard, group_by,
+                                           start_date, end_date, movement_fields))
+            shard = []
+            if len(pending) >= 2 * workers:
+                _merge_summaries(summaries, pending.popleft().result())
+        if shard:
+            pending.append(executor.submit(_summarize_shard, shard, group_by,
+                                           start_date, end_date, movement_fields))
+        while pending:
+            _merge_summaries(summaries, pending.popleft().result())
+    return summaries
+
+
+class MovementStore:
+    """
+    Base class of local movement stores written by sync_movements and fetch_all_movements
+
+    Movements are keyed per contract by movement_identity(); the newest movement
+    date seen is the incremental sync high-water mark.
+    """
+
+    def high_water_mark(self, contract_id: str) -> Optional[datetime]:
+        """Newest movement date stored for the contract, or None if nothing is stored"""
+        raise NotImplementedError
+
+    def merge(self, contract_id: str, movements: List[Dict[str, Any]]) -> int:
+        """
+        Insert or update movements
+
+        Returns:
+            Number of movements that were not stored yet
+        """
+        raise NotImplementedError
+
+    def movements(self, contract_id: str) -> List[Dict[str, Any]]:
+        """All stored movements of the contract, newest first"""
+        raise NotImplementedError
+
+
+class JsonMovementStore(MovementStore):
+    """
+    Local JSON file store of movements per contract, used by sync_movements
+
+    Movements are keyed by movement_identity(), and the newest movement date seen
+    is kept per contract as the incremental sync high-water mark.
+    """
+
+    def __init__(self, path: str, movement_fields: MovementFields = DEFAULT_MOVEMENT_FIELDS):
+        """
+        Args:
+            path: JSON file holding the store (created on first write)
+            movement_fields: Names of the id and device fields, the same every time
+                             the store is opened (default: DEFAULT_MOVEMENT_FIELDS)
+        """
+        self.path = path
+        self.movement_fields = movement_fields
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._data = json.load(f)
+        except FileNotFoundError:
+            self._data = {"contracts": {}, "identity_version": IDENTITY_VERSION}
+        if self._data.get("identity_version", 1) != IDENTITY_VERSION:
+            # Re-key movements stored with an older movement_identity()
+            for contract in self._data["contracts"].values():
+                contract["movements"] = {movement_identity(movement, movement_fields): movement
+                                         for movement in contract["movements"].values()}
+            self._data["identity_version"] = IDENTITY_VERSION
+
+    def _contract(self, contract_id: str) -> Dict[str, Any]:
+        return self._data["contracts"].setdefault(
+            contract_id, {"high_water_mark": None, "movements": {}}
+        )
+
+    def high_water_mark(self, contract_id: str) -> Optional[datetime]:
+        with self._lock:
+            contract = self._data["contracts"].get(contract_id)
+            if not contract or not contract["high_water_mark"]:
+                return None
+            return datetime.fromisoformat(contract["high_water_mark"])
+
+    def merge(self, contract_id: str, movements: List[Dict[str, Any]]) -> int:
+        with self._lock:
+            contract = self._contract(contract_id)
+            stored = contract["movements"]
+            high_water_mark = contract["high_water_mark"]
+            added = 0
+            for movement in movements:
+                identity = movement_identity(movement, self.movement_fields)
+                if identity not in stored:
+                    added += 1
+                stored[identity] = _as_dict(movement)
+                movement_datetime = _parse_movement_datetime(movement)
+                if movement_datetime is not None:
+                    value = movement_datetime.isoformat()
+                    if high_water_mark is None or value > high_water_mark:
+                        high_water_mark = value
+            contract["high_water_mark"] = high_water_mark
+            _write_json_atomic(self.path, self._data)
+            return added
+
+    def movements(self, contract_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            contract = self._data["contracts"].get(contract_id)
+            movements = list(contract["movements"].values()) if contract else []
+        return sorted(movements, key=lambda m: _parse_movement_datetime(m) or datetime.min,
+                      reverse=True)
+
+
+class SQLiteMovementStore(MovementStore):
+    """
+    Local SQLite store of movements, indexed for queries that don't hit the API
+
+    Each movement is stored as JSON next to indexed columns: movement date
+    (dataIngresso, falling back to dataUscita), device and payment status (see
+    MovementFields) and charged amount in cents.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS movements (
+            contract_id TEXT NOT NULL,
+            identity TEXT NOT NULL,
+            movement_date TEXT,
+            device TEXT,
+            payment_status TEXT,
+            amount_cents INTEGER,
+            data TEXT NOT NULL,
+            PRIMARY KEY (contract_id, identity)
+        );
+        CREATE INDEX IF NOT EXISTS movements_date ON movements (contract_id, movement_date);
+        CREATE INDEX IF NOT EXISTS movements_device ON movements (contract_id, device, movement_date);
+        CREATE INDEX IF NOT EXISTS movements_status ON movements (contract_id, payment_status);
+    """
+
+    def __init__(self, path: str, movement_fields: MovementFields = DEFAULT_MOVEMENT_FIELDS):
+        """
+        Args:
+            path: SQLite database file (created if missing), or ':memory:'
+            movement_fields: Names of the id, device and payment status fields, the same
+                             every time the store is opened (default: DEFAULT_MOVEMENT_FIELDS)
+        """
+        self.path = path
+        self.movement_fields = movement_fields
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(self.SCHEMA)
+            self._migrate_identities()
+
+    def _migrate_identities(self) -> None:
+        """Re-key movements stored with an older movement_identity()"""
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version == IDENTITY_VERSION:
+            return
+        rows = self._connection.execute("SELECT rowid, data FROM movements").fetchall()
+        self._connection.executemany(
+            "UPDATE movements SET identity = ? WHERE rowid = ?",
+            [(movement_identity(json.loads(data), self.movement_fields), rowid)
+             for rowid, data in rows]
+        )
+        self._connection.execute(f"PRAGMA user_version = {IDENTITY_VERSION}")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "SQLiteMovementStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def high_water_mark(self, contract_id: str) -> Optional[datetime]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT MAX(movement_date) FROM movements WHERE contract_id = ?",
+                (contract_id,)
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row[0] else None
+
+    def merge(self, contract_id: str, movements: List[Dict[str, Any]]) -> int:
+        added = 0
+        with self._lock, self._connection:
+            for movement in movements:
+                movement_datetime = _parse_movement_datetime(movement)
+                amount = _movement_amount(movement)
+                row = (
+                    movement_datetime.isoformat() if movement_datetime else None,
+                    self.movement_fields.device_of(movement),
+                    self.movement_fields.payment_status_of(movement),
+                    int(amount * 100) if amount is not None else None,
+                    json.dumps(_as_dict(movement)),
+                    contract_id,
+                    movement_identity(movement, self.movement_fields),
+                )
+                cursor = self._connection.execute(
+                    "UPDATE movements SET movement_date = ?, device = ?, payment_status = ?, "
+                    "amount_cents = ?, data = ? WHERE contract_id = ? AND identity = ?",
+                    row
+                )
+                if cursor.rowcount == 0:
+                    self._connection.execute(
+                        "INSERT INTO movements (movement_date, device, payment_status, "
+                        "amount_cents, data, contract_id, identity) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        row
+                    )
+                    added += 1
+        return added
+
+    def _where(self, contract_id: str, start_date: Optional[date], end_date: Optional[date],
+               device: Optional[str], payment_status: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses = ["contract_id = ?"]
+        params: List[Any] = [contract_id]
+        if start_date is not None:
+            clauses.append("movement_date >= ?")
+            params.append(start_date.isoformat())
+        if end_date is not None:
+            clauses.append("movement_date < ?")
+            params.append((end_date + timedelta(days=1)).isoformat())
+        if device is not None:
+            clauses.append("device = ?")
+            params.append(device)
+        if payment_status is not None:
+            clauses.append("payment_status = ?")
+            params.append(payment_status)
+        return " AND ".join(clauses), params
+
+    def query(self, contract_id: str,
+              start_date: Optional[date] = None,
+              end_date: Optional[date] = None,
+              device: Optional[str] = None,
+              payment_status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Stored movements matching all given filters, newest first
+
+        Args:
+            contract_id: Contract ID
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            device: Device, as found in the movement_fields device fields
+            payment_status: Payment status (e.g. 'DA_ADDEBITARE')
+
+        Returns:
+            Matching movement dictionaries
+        """
+        where, params = self._where(contract_id, start_date, end_date, device, payment_status)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT data FROM movements WHERE {where} ORDER BY movement_date DESC", params
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def movements(self, contract_id: str) -> List[Dict[str, Any]]:
+        return self.query(contract_id)
+
+    def totals_by_device(self, contract_id: str,
+                         start_date: Optional[date] = None,
+                         end_date: Optional[date] = None,
+                         payment_status: Optional[str] = None) -> Dict[Optional[str], Decimal]:
+        """
+        Total charged amount per device
+
+        Returns:
+            Dictionary mapping device to the sum of importoAddebitato (or saldo)
+        """
+        where, params = self._where(contract_id, start_date, end_date, None, payment_status)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT device, SUM(amount_cents) FROM movements WHERE {where} GROUP BY device",
+                params
+            ).fetchall()
+        return {device: Decimal(cents or 0).scaleb(-2) for device, cents in rows}
+
+
+def _page_digest(movements: List[Dict[str, Any]]) -> str:
+    """Stable hash of a page of movements"""
+    data = json.dumps([_as_dict(movement) for movement in movements], sort_keys=True,
+                      separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class PaginationCheckpoint:
+    """
+    Pages of a fetch_all_movements run saved as they arrive, so that an
+    interrupted run resumes where it stopped
+
+    The file starts with a header line (contract, interval, batch size) followed
+    by one JSON line per page with its offset, hash and movements. Appending a
+    line per page keeps each save proportional to the page, not to the history.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, contract_id: str, interval: str, batch_size: int,
+                 fields: Optional[Iterable[str]] = None):
+        """
+        Args:
+            path: File holding the checkpoint (created on the first saved page)
+            contract_id: Contract being fetched
+            interval: Time interval being fetched
+            batch_size: Number of records per page
+            fields: Movement fields being fetched, None for all of them
+        """
+        self.path = path
+        self.header = {"version": self.VERSION, "contract_id": contract_id,
+                       "interval": interval, "batch_size": batch_size,
+                       "fields": sorted(set(fields)) if fields is not None else None}
+
+    def load(self) -> Tuple[int, Optional[str], List[Dict[str, Any]]]:
+        """
+        Read the saved pages
+
+        A checkpoint written for other arguments, or ending with a partially
+        written line, is read up to its last complete page.
+
+        Returns:
+            Offset and hash of the last saved page (0 and None if there is none),
+            and the movements of all saved pages in server order
+        """
+        movements: List[Dict[str, Any]] = []
+        last_offset, last_digest = 0, None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                if json.loads(f.readline()) != self.header:
+                    return 0, None, []
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    page = json.loads(line)
+                    expected = last_offset + self.header["batch_size"] if last_offset else 1
+                    if page["offset"] != expected:
+                        break
+                    movements.extend(page["movements"])
+                    last_offset, last_digest = page["offset"], page["digest"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return last_offset, last_digest, movements
+
+    def append(self, offset: int, movements: List[Dict[str, Any]]) -> None:
+        """Save a page fetched at the given offset"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lines = []
+        if offset == 1 or not os.path.exists(self.path):
+            lines.append(json.dumps(self.header))
+        lines.append(json.dumps({"offset": offset, "digest": _page_digest(movements),
+                                 "movements": [_as_dict(m) for m in movements]},
+                                default=str))
+        with open(self.path, 'w' if offset == 1 else 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+    def clear(self) -> None:
+        """Delete the checkpoint"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class PdfReportCache:
+    """
+    On-disk cache of generated PDF reports, bounded in size with least recently
+    used eviction
+
+    Reports are keyed by a hash of the contract, the recipient and the content of
+    the movements, so regenerating the report of a closed month is served from
+    disk. Recency is tracked through the file modification times, which lets
+    several processes share a cache directory. Only files named after a key are
+    ever evicted, so other files in the directory are left alone.
+    """
+
+    # Names of the cached reports: the hex SHA-256 key
+    FILE_NAME = re.compile(r"[0-9a-f]{64}\.pdf")
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            directory: Directory holding the cached PDFs (created on first write)
+            max_bytes: Total size above which the least recently used reports are
+                       evicted (default: 256 MiB)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def key(contract_id: str, intestatario: str, movements: Iterable[Dict[str, Any]]) -> str:
+        """
+        Stable key of a report
+
+        The whole content of the movements is hashed, in order, since fields such as
+        the payment status may appear in the report.
+        """
+        data = json.dumps([contract_id, intestatario, [_as_dict(m) for m in movements]],
+                          sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF, marking it as recently used, or None"""
+        f = self.open(key)
+        if f is None:
+            return None
+        try:
+            with f:
+                return f.read()
+        except OSError:
+            return None
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """
+        Open the cached PDF for reading, marking it as recently used, or return None
+
+        The file stays readable if it is evicted while open.
+        """
+        path = self._path(key)
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Evicted meanwhile
+            pass
+        return f
+
+    def put(self, key: str, content: bytes) -> None:
+        """Save a PDF, evicting the least recently used ones beyond max_bytes"""
+        path = self._path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            previous = self._file_size(path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._added(len(content) - previous)
+
+    def put_file(self, key: str, source: str) -> None:
+        """Save a PDF from a file, without reading it in memory"""
+        path = self._path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            shutil.copyfile(source, tmp_path)
+            previous = self._file_size(path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._added(os.path.getsize(path) - previous)
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        """Size of a cached report about to be replaced, 0 if there is none"""
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _added(self, size: int) -> None:
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            if self._size is None or self._size > self.max_bytes:
+                self._size = self._evict()
+
+    def _evict(self) -> int:
+        """Remove the least recently used PDFs until the cache fits, return its size"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not self.FILE_NAME.fullmatch(entry.name):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Already evicted by another process
+                pass
+            total -= size
+        return total
+
+
+class PdfLatencyModel:
+    """
+    Linear model of the PDF generation time as a function of the number of
+    movements, fitted on the latest reports, used to size split requests
+
+    Chunks are sized so that each report is expected to take target_latency
+    seconds: large enough to amortize the per-request overhead, small enough
+    to stay clear of server timeouts.
+    """
+
+    def __init__(self, target_latency: float = 15.0, default_chunk_size: int = 500,
+                 min_chunk_size: int = 50, max_chunk_size: int = 5000, window: int = 32):
+        """
+        Args:
+            target_latency: Expected seconds per chunk (default: 15.0)
+            default_chunk_size: Chunk size until reports have been observed (default: 500)
+            min_chunk_size: Smallest chunk size (default: 50)
+            max_chunk_size: Largest chunk size (default: 5000)
+            window: Number of latest reports the model is fitted on (default: 32)
+        """
+        self.target_latency = target_latency
+        self.default_chunk_size = default_chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, movements: int, latency: float) -> None:
+        """Record the time a report of the given number of movements took"""
+        if movements > 0:
+            with self._lock:
+                self._samples.append((movements, latency))
+
+    def estimate(self) -> Optional[Tuple[float, float]]:
+        """
+        Fitted (overhead, seconds per movement), or None without observations
+
+        With a single size observed the overhead can't be told apart and is taken as 0.
+        """
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return None
+        count = len(samples)
+        mean_x = sum(x for x, _ in samples) / count
+        mean_y = sum(y for _, y in samples) / count
+        variance = sum((x - mean_x) ** 2 for x, _ in samples)
+        if variance > 0:
+            slope = sum((x - mean_x) * (y - mean_y) for x, y in samples) / variance
+            if slope > 0:
+                return max(mean_y - slope * mean_x, 0.0), slope
+        return 0.0, mean_y / mean_x
+
+    def chunk_size(self) -> int:
+        """Number of movements per request expected to take target_latency"""
+        estimate = self.estimate()
+        if estimate is None:
+            size = self.default_chunk_size
+        else:
+            overhead, per_movement = estimate
+            if per_movement <= 0:
+                size = self.max_chunk_size
+            else:
+                size = int((self.target_latency - overhead) / per_movement)
+        return max(self.min_chunk_size, min(self.max_chunk_size, size))
+
+
+def _split_evenly(movements: List[Dict[str, Any]], chunk_size: int) -> List[List[Dict[str, Any]]]:
+    """Split into the fewest chunks of at most chunk_size, with sizes differing by at most 1"""
+    chunks = -(-len(movements) // chunk_size)
+    size, extra = divmod(len(movements), chunks)
+    result = []
+    start = 0
+    for index in range(chunks):
+        end = start + size + (1 if index < extra else 0)
+        result.append(movements[start:end])
+        start = end
+    return result
+
+
+def _merge_pdfs(contents: List[bytes]) -> bytes:
+    """Concatenate PDF documents"""
+    if PdfWriter is None:
+        raise ImportError("Merging split PDF reports requires pypdf: pip install pypdf")
+    writer = PdfWriter()
+    for content in contents:
+        writer.append(PdfReader(io.BytesIO(content)))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def _dumps(value: Any) -> bytes:
+    """Encode compact JSON, with orjson when installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            # Types orjson doesn't handle (e.g. non-string keys), let json decide
+            pass
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class _PdfPayload:
+    """
+    PDF request body encoded on the fly from the original movements
+
+    Each movement is encoded as is and the 'checked' and 'id' fields are spliced
+    before its closing brace, instead of copying every movement to add them.
+    Movements already having one of these fields are copied, so that the values
+    sent replace theirs. The body is produced in chunks of about chunk_size bytes
+    and can be iterated again when a request is replayed.
+    """
+
+    def __init__(self, movements: List[Dict[str, Any]], intestatario: str,
+                 chunk_size: int = 64 * 1024):
+        self.movements = movements
+        self.intestatario = intestatario
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        buffer = bytearray(b'{"intestatario":')
+        buffer += _dumps(self.intestatario)
+        buffer += b',"listaMovimenti":['
+        for idx, movement in enumerate(self.movements):
+            if idx:
+                buffer += b","
+            if isinstance(movement, Movement) or "checked" in movement or "id" in movement:
+                movement_copy = movement.to_dict() if isinstance(movement, Movement) \
+                    else movement.copy()
+                movement_copy['checked'] = True
+                movement_copy['id'] = str(idx)
+                buffer += _dumps(movement_copy)
+            else:
+                encoded = _dumps(movement)
+                buffer += memoryview(encoded)[:-1]
+                if len(encoded) > 2:
+                    buffer += b","
+                buffer += b'"checked":true,"id":"%d"}' % idx
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += b"]}"
+        yield bytes(buffer)
+
+
+class _AsyncPdfPayload:
+    """_PdfPayload as the async iterable httpx.AsyncClient expects"""
+
+    def __init__(self, payload: _PdfPayload):
+        self.payload = payload
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self.payload:
+            yield chunk
+
+
+@functools.lru_cache(maxsize=32)
+def _projection_decoder(fields: Tuple[str, ...]) -> "msgspec.json.Decoder":
+    """
+    msgspec decoder of a movements response keeping only the given movement fields
+
+    Other fields, and top-level keys other than 'dispositivi' and 'listaMovimenti',
+    are skipped while parsing instead of being decoded then discarded. A null
+    'listaMovimenti' decodes to None as without projection.
+    """
+    movement = TypedDict("ProjectedMovement", {name: Any for name in fields}, total=False)
+    page = TypedDict("ProjectedMovementsPage",
+                     {"dispositivi": Any, "listaMovimenti": Optional[List[movement]]},
+                     total=False)
+    return msgspec.json.Decoder(page)
+
+
+def _project(movements: List[Dict[str, Any]], fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Keep only the given fields of decoded movements"""
+    return [{name: movement[name] for name in fields if name in movement}
+            for movement in movements]
+
+
+def _encode_categories(values: List[Any]) -> Tuple["np.ndarray", List[Any]]:
+    """Encode values as integer codes into a list of distinct categories"""
+    index: Dict[Any, int] = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) for value in values),
+                        dtype=np.int32, count=len(values))
+    return codes, list(index)
+
+
+class MovementTable:
+    """
+    Column-oriented view of a movement history, for vectorized filtering and aggregation
+
+    Holds movement dates as datetime64 (NaT when missing or unparseable), amounts
+    as integer cents and stations, devices and payment statuses as categorical
+    codes. Requires the optional 'numpy' dependency.
+    """
+
+    # Categorical columns available to group_by_sum, besides 'month'
+    CATEGORICAL_COLUMNS = ("device", "payment_status", "inizio_tratta", "fine_tratta")
+
+    def __init__(self, rows: List[Dict[str, Any]], dates: "np.ndarray",
+                 amount_cents: "np.ndarray", saldo_cents: "np.ndarray",
+                 codes: Dict[str, "np.ndarray"], categories: Dict[str, List[Any]]):
+        self.rows = rows
+        self.dates = dates
+        self.amount_cents = amount_cents
+        self.saldo_cents = saldo_cents
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def from_movements(cls, movements: List[Dict[str, Any]],
+                       movement_fields: MovementFields = DEFAULT_MOVEMENT_FIELDS
+                       ) -> "MovementTable":
+        """
+        Build a table from movement dictionaries or Movement records
+
+        Args:
+            movements: Movement dictionaries or Movement records
+            movement_fields: Names of the device and payment status fields
+                             (default: DEFAULT_MOVEMENT_FIELDS)
+
+        Raises:
+            ImportError: If numpy is not installed
+        """
+        if np is None:
+            raise ImportError("MovementTable requires numpy: pip install numpy")
+        rows = list(movements)
+        count = len(rows)
+
+        dates = np.array([_parse_movement_datetime(movement) or "NaT" for movement in rows],
+                         dtype="datetime64[s]").reshape(count)
+        amount_cents = np.zeros(count, dtype=np.int64)
+        saldo_cents = np.zeros(count, dtype=np.int64)
+        for position, movement in enumerate(rows):
+            amount = _movement_amount(movement)
+            if amount is not None:
+                amount_cents[position] = int(amount * 100)
+            balance = movement.saldo if isinstance(movement, Movement) \
+                else _parse_amount(movement.get("saldo"))
+            if balance is not None:
+                saldo_cents[position] = int(balance * 100)
+
+        columns = {
+            "device": [movement_fields.device_of(movement) for movement in rows],
+            "payment_status": [movement_fields.payment_status_of(movement) for movement in rows],
+            "inizio_tratta": [movement.get("inizioTratta") for movement in rows],
+            "fine_tratta": [movement.get("fineTratta") for movement in rows],
+        }
+        codes = {}
+        categories = {}
+        for name, values in columns.items():
+            codes[name], categories[name] = _encode_categories(values)
+        return cls(rows, dates, amount_cents, saldo_cents, codes, categories)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def take(self, selection: "np.ndarray") -> "MovementTable":
+        """Sub-table of the rows selected by a boolean mask or index array"""
+        positions = np.flatnonzero(selection) if selection.dtype == bool else selection
+        return MovementTable(
+            [self.rows[position] for position in positions],
+            self.dates[positions],
+            self.amount_cents[positions],
+            self.saldo_cents[positions],
+            {name: codes[positions] for name, codes in self.codes.items()},
+            self.categories,
+        )
+
+    def date_mask(self, start_date: date, end_date: date) -> "np.ndarray":
+        """Boolean mask of the movements within the date range (both inclusive)"""
+        start = np.datetime64(start_date, "s")
+        end = np.datetime64(end_date + timedelta(days=1), "s")
+        # NaT compares False, so movements without a date are excluded
+        return (self.dates >= start) & (self.dates < end)
+
+    def filter_by_date(self, start_date: date, end_date: date) -> "MovementTable":
+        """Sub-table of the movements within the date range (both inclusive)"""
+        return self.take(self.date_mask(start_date, end_date))
+
+    def filter_movements_by_date(self, start_date: date,
+                                 end_date: date) -> List[Dict[str, Any]]:
+        """Same result as UnipolMoveClient.filter_movements_by_date on the table rows"""
+        return self.filter_by_date(start_date, end_date).rows
+
+    def where(self, column: str, value: Any) -> "MovementTable":
+        """Sub-table of the movements whose categorical column equals value"""
+        try:
+            code = self.categories[column].index(value)
+        except ValueError:
+            return self.take(np.zeros(len(self), dtype=bool))
+        return self.take(self.codes[column] == code)
+
+    def _amounts(self, amount: str) -> "np.ndarray":
+        if amount == "importo":
+            return self.amount_cents
+        if amount == "saldo":
+            return self.saldo_cents
+        raise ValueError(f"Unknown amount column: {amount!r}")
+
+    def total(self, amount: str = "importo") -> Decimal:
+        """
+        Sum of an amount column
+
+        Args:
+            amount: 'importo' (importoAddebitato, falling back to saldo) or 'saldo'
+        """
+        return Decimal(int(self._amounts(amount).sum())).scaleb(-2)
+
+    def group_by_sum(self, by: str, amount: str = "importo") -> Dict[Any, Decimal]:
+        """
+        Sum of an amount column per group
+
+        Args:
+            by: One of CATEGORICAL_COLUMNS, or 'month' (first day of the month as a date,
+                movements without a date are left out)
+            amount: 'importo' (importoAddebitato, falling back to saldo) or 'saldo'
+
+        Returns:
+            Dictionary mapping each group to its total
+        """
+        cents = self._amounts(amount)
+        if by == "month":
+            has_date = ~np.isnat(self.dates)
+            months = self.dates[has_date].astype("datetime64[M]")
+            keys, codes = np.unique(months, return_inverse=True)
+            categories = [key.astype(date) for key in keys]
+            cents = cents[has_date]
+        elif by in self.CATEGORICAL_COLUMNS:
+            codes = self.codes[by]
+            categories = self.categories[by]
+        else:
+            raise ValueError(f"Unknown group column: {by!r}")
+
+        # Sums stay exact as float64 below 2**53 cents
+        sums = np.bincount(codes.ravel(), weights=cents, minlength=len(categories))
+        present = np.bincount(codes.ravel(), minlength=len(categories)) > 0
+        return {categories[code]: Decimal(int(round(sums[code]))).scaleb(-2)
+                for code in np.flatnonzero(present)}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the rate of API requests
+
+    Share one bucket between clients to enforce a rate across all of them.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Args:
+            rate: Requests per second allowed in the long run
+            burst: Requests allowed at once after an idle period (default: max(rate, 1))
+        """
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for the given time (e.g. from a Retry-After header)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self) -> None:
+        """Block until a request may be sent"""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait, without blocking the event loop, until a request may be sent"""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """
+    Token buckets per API endpoint and gateway client id
+
+    Each (endpoint, x-ibm-client-id) pair gets its own bucket, created on first use.
+    Endpoints are 'environment', 'login', 'movements' and 'pdf'.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None,
+                 endpoint_rates: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            rate: Requests per second allowed per endpoint and client id
+            burst: Requests allowed at once after an idle period (default: max(rate, 1))
+            endpoint_rates: Per-endpoint overrides of rate, e.g. {'pdf': 0.5}
+        """
+        self.rate = rate
+        self.burst = burst
+        self.endpoint_rates = endpoint_rates or {}
+        self._buckets: Dict[Tuple[str, Optional[str]], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint: str, client_id: Optional[str]) -> TokenBucket:
+        """Bucket of an endpoint and gateway client id"""
+        with self._lock:
+            key = (endpoint, client_id)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.endpoint_rates.get(endpoint, self.rate), self.burst)
+                self._buckets[key] = bucket
+            return bucket
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on the number of requests in flight
+
+    The limit grows additively (about one per limit-many healthy responses) while
+    latency stays under the target, and is cut multiplicatively on 429, 5xx or
+    connection errors, at most once per cooldown period. Use one controller from
+    either threads or a single event loop.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 latency_target: float = 2.0, decrease_factor: float = 0.5,
+                 cooldown: float = 1.0):
+        """
+        Args:
+            initial: Starting limit (default: 4)
+            minimum: Lowest limit (default: 1)
+            maximum: Highest limit (default: 32)
+            latency_target: Responses faster than this many seconds grow the limit (default: 2.0)
+            decrease_factor: Multiplier applied to the limit on overload (default: 0.5)
+            cooldown: Minimum seconds between two decreases (default: 1.0)
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._async_condition: Optional[asyncio.Condition] = None
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return int(self._limit)
+
+    def _try_acquire(self) -> bool:
+        with self._condition:
+            if self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return True
+            return False
+
+    def _update(self, status: Optional[int], latency: float) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if status is None or status == 429 or status >= 500:
+                if now - self._last_decrease >= self.cooldown:
+                    self._limit = max(self.minimum, self._limit * self.decrease_factor)
+                    self._last_decrease = now
+            elif latency <= self.latency_target:
+                self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+            self._condition.notify_all()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+
+    def release(self, status: Optional[int], latency: float) -> None:
+        """
+        Record a finished request
+
+        Args:
+            status: HTTP status code, or None if the request failed without a response
+            latency: Request duration in seconds
+        """
+        self._update(status, latency)
+
+    async def acquire_async(self) -> None:
+        """Wait, without blocking the event loop, until a request may be sent"""
+        if self._async_condition is None:
+            self._async_condition = asyncio.Condition()
+        async with self._async_condition:
+            await self._async_condition.wait_for(self._try_acquire)
+
+    async def release_async(self, status: Optional[int], latency: float) -> None:
+        """Record a finished request, see release()"""
+        self._update(status, latency)
+        if self._async_condition is not None:
+            async with self._async_condition:
+                self._async_condition.notify_all()
+
+
+def _retry_after(headers, default: float) -> float:
+    """Seconds to wait from a Retry-After header (seconds or HTTP date)"""
+    value = headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class UnipolMoveError(Exception):
+    """Base class of the errors raised by this library"""
+
+
+class PaginationError(UnipolMoveError):
+    """
+    Fetching a page of movements failed
+
+    Attributes:
+        offset: Offset of the page that failed, where pagination can resume
+        movements: Movements fetched before the failing page, in server order
+    """
+
+    def __init__(self, offset: int, movements: Optional[List[Dict[str, Any]]] = None):
+        super().__init__(f"Fetching movements at offset {offset} failed")
+        self.offset = offset
+        self.movements = movements if movements is not None else []
+
+
+class RetryPolicy:
+    """
+    Retries of failed requests with exponential backoff and jitter
+
+    By default only GET requests (movements, environment.json) are retried, on
+    connection errors, timeouts and the given HTTP statuses.
+    """
+
+    def __init__(self, max_attempts: int = 3, backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0, jitter: bool = True,
+                 retry_statuses: FrozenSet[int] = frozenset({500, 502, 503, 504}),
+                 methods: FrozenSet[str] = frozenset({"GET"})):
+        """
+        Args:
+            max_attempts: Total attempts per request, including the first one (default: 3)
+            backoff_factor: Delay before the first retry, doubled for each next one (default: 0.5)
+            max_backoff: Upper bound of the delay in seconds (default: 30.0)
+            jitter: Wait a random time between 0 and the delay ("full jitter", default: True)
+            retry_statuses: HTTP statuses to retry (default: 500, 502, 503, 504)
+            methods: HTTP methods to retry (default: GET)
+        """
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = retry_statuses
+        self.methods = methods
+
+    def should_retry(self, method: str, status: Optional[int], attempt: int) -> bool:
+        """
+        Whether to retry after the given attempt (1-based) failed
+
+        Args:
+            method: HTTP method
+            status: HTTP status code, or None for connection errors and timeouts
+            attempt: Number of attempts made so far
+        """
+        if attempt >= self.max_attempts or method.upper() not in self.methods:
+            return False
+        return status is None or status in self.retry_statuses
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the given attempt (1-based) failed"""
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+# Retry policy of clients created without one; each client gets its own copy, so
+# changing client.retry_policy doesn't affect the other clients
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class PdfJob(NamedTuple):
+    """A PDF report to generate with generate_pdf_reports"""
+
+    movements: List[Dict[str, Any]]
+    intestatario: str
+    output_filename: Optional[str] = None
+
+
+class PdfJobResult(NamedTuple):
+    """Outcome of a PdfJob"""
+
+    job: PdfJob
+    content: Optional[bytes]
+    error: Optional[Exception]
+
+
+# Called after each report with the number of reports done, the total and the result
+PdfProgressCallback = Callable[[int, int, PdfJobResult], None]
+
+# Generating a report has no side effect, so batches retry the POST requests too
+PDF_BATCH_RETRY_POLICY = RetryPolicy(methods=frozenset({"GET", "POST"}))
+
+
+class PdfReportInfo(NamedTuple):
+    """Metadata of a PDF report downloaded with download_pdf_report"""
+
+    path: Optional[str]
+    size: int
+    sha256: str
+
+
+class _PdfDownload:
+    """
+    Destination of a streamed PDF: a path, written through a temporary file
+    renamed on success, or a writable binary file object
+    """
+
+    def __init__(self, destination: Union[str, "os.PathLike", Any]):
+        self._digest = hashlib.sha256()
+        self.size = 0
+        if hasattr(destination, "write"):
+            self.path = None
+            self._tmp_path = None
+            self._file = destination
+        else:
+            self.path = os.fspath(destination)
+            self._tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            self._file = open(self._tmp_path, 'wb')
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._digest.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> PdfReportInfo:
+        if self._tmp_path is not None:
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+        return PdfReportInfo(self.path, self.size, self._digest.hexdigest())
+
+    def abort(self) -> None:
+        if self._tmp_path is not None:
+            self._file.close()
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+
+# Returns the (username, password) to log in with when the session expires
+CredentialProvider = Callable[[], Tuple[str, str]]
+
+
+class _SessionRenewal:
+    """
+    Latest login of a client and its for_contract() copies
+
+    A request failing with an expired session triggers a new login only if no
+    other request has renewed the session since it was sent.
+    """
+
+    __slots__ = ("generation", "cookies", "lock", "async_lock")
+
+    def __init__(self):
+        self.generation = 0
+        self.cookies: Optional[Tuple[str, str]] = None
+        self.lock = threading.Lock()
+        self.async_lock: Optional[asyncio.Lock] = None
+
+
+def _build_session(pool_connections: int, pool_maxsize: int,
+                   pool_block: bool, keep_alive: bool) -> requests.Session:
+    """Create a requests.Session backed by a pooled, keep-alive HTTPAdapter"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize,
+                          pool_block=pool_block)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+class _BaseClient:
+    """
+    State and request building shared by UnipolMoveClient and AsyncUnipolMoveClient
+
+    Subclasses provide the transport and credentials resolution.
+    """
+
+    BASE_URL = "https://www.unipolmove.it"
+
+    # API endpoints
+    ENV_ENDPOINT = '/app/config/environment.json'
+    MOVEMENTS_ENDPOINT = "/api/ut/prv/unipolmove/portale-tlpd/servizi-mobilita/v6/contratti/{contract_id}/movimenti"
+    PDF_ENDPOINT = "/api/us/prv/tpd/telepedaggio-us/post-vendita/v1/contratti/{contract_id}/movimenti/stampa"
+    LOGIN_ENDPOINT = "/login"
+
+    MOVEMENTS_REFERER = "https://www.unipolmove.it/app/post-vendita/homepage/movements"
+    LOGIN_REFERER = "https://www.unipolmove.it/app/login"
+    USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:144.0) Gecko/20100101 Firefox/144.0"
+
+    # Server 'intervallo' values with the number of days they reach back, narrowest first
+    INTERVALS = (
+        ("ULTIMO_ANNO", 366),
+    )
+
+    def __init__(self, contract_id: str, mrh_session: Optional[str],
+                 last_mrh_session: Optional[str], session_id: Optional[str],
+                 credentials: Optional[GatewayCredentials], credentials_ttl: float,
+                 cache_dir: Optional[str],
+                 rate_limiter: Optional[Union[TokenBucket, RateLimiter]],
+                 concurrency_limiter: Optional[AdaptiveConcurrency],
+                 max_rate_limit_retries: int, retry_policy: Optional[RetryPolicy],
+                 credential_provider: Optional[CredentialProvider], session_cache: bool,
+                 pdf_cache: Optional[PdfReportCache],
+                 pdf_latency_model: Optional[PdfLatencyModel],
+                 json_decoder: Optional[JsonDecoder], movement_records: bool):
+        if session_cache and not cache_dir:
+            raise ValueError("The session cache requires a cache_dir")
+        self.contract_id = contract_id
+        self.mrh_session = mrh_session
+        self.last_mrh_session = last_mrh_session
+        self.session_id = session_id or str(uuid.uuid4())
+        self.credentials_ttl = credentials_ttl
+        self.cache_dir = cache_dir
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.max_rate_limit_retries = max_rate_limit_retries
+        if retry_policy is DEFAULT_RETRY_POLICY:
+            retry_policy = copy.copy(retry_policy)
+        self.retry_policy = retry_policy
+        self.credential_provider = credential_provider
+        self.session_cache = session_cache
+        self.pdf_cache = pdf_cache
+        self.pdf_latency_model = pdf_latency_model or PdfLatencyModel()
+        self.json_decoder = json_decoder or DEFAULT_JSON_DECODER
+        self.movement_records = movement_records
+        self._credentials = credentials
+        self._renewal = _SessionRenewal()
+        self._session_generation = 0
+        self._owns_transport = True
+
+    def for_contract(self, contract_id: str) -> "_BaseClient":
+        """
+        Client for another contract of the same account
+
+        The new client shares session cookies, gateway credentials, rate limiter
+        and HTTP transport with this one; closing it doesn't close the transport.
+        A later login through either client is picked up by the other.
+        """
+        client = copy.copy(self)
+        client.contract_id = contract_id
+        client._owns_transport = False
+        return client
+
+    @property
+    def credentials(self) -> GatewayCredentials:
+        """API gateway credentials, resolved lazily on first use"""
+        if self._credentials is None:
+            self._credentials = self._resolve_credentials()
+        return self._credentials
+
+    def _resolve_credentials(self) -> GatewayCredentials:
+        raise NotImplementedError
+
+    # Seconds to wait after a 429 response without a Retry-After header
+    DEFAULT_RETRY_AFTER = 1.0
+
+    def _replay_delay(self, method: str, status: Optional[int], headers,
+                      bucket: Optional[TokenBucket], failures: int,
+                      rate_limits: int) -> Tuple[Optional[float], int, int]:
+        """
+        Decide whether to replay a request
+
+        Args:
+            status: HTTP status code, or None if the request raised a retryable error
+            failures: Failed attempts before this one
+            rate_limits: Replays after a 429 before this one
+
+        Returns:
+            Seconds to sleep before replaying (None to stop), and the updated counters
+        """
+        if status == 429 and rate_limits < self.max_rate_limit_retries:
+            delay = _retry_after(headers, self.DEFAULT_RETRY_AFTER)
+            if bucket is not None:
+                # The bucket holds every request for the delay, including this one
+                bucket.pause(delay)
+                delay = 0.0
+            return delay, failures, rate_limits + 1
+        if self.retry_policy is not None and \
+                self.retry_policy.should_retry(method, status, failures + 1):
+            return self.retry_policy.delay(failures + 1), failures + 1, rate_limits
+        return None, failures, rate_limits
+
+    def _rate_bucket(self, endpoint: str, headers: Optional[Dict[str, str]]
+                     ) -> Optional[TokenBucket]:
+        """Token bucket throttling a request, if any"""
+        if isinstance(self.rate_limiter, RateLimiter):
+            client_id = headers.get("x-ibm-client-id") if headers else None
+            return self.rate_limiter.bucket(endpoint, client_id)
+        return self.rate_limiter
+
+    @property
+    def movements_client_id(self) -> str:
+        return self.credentials.movements_client_id
+
+    @property
+    def movements_client_secret(self) -> str:
+        return self.credentials.movements_client_secret
+
+    @property
+    def pdf_client_id(self) -> str:
+        return self.credentials.pdf_client_id
+
+    @property
+    def pdf_client_secret(self) -> str:
+        return self.credentials.pdf_client_secret
+
+    def _get_headers(self, client_id: str, client_secret: str,
+                     referer: str = None) -> Dict[str, str]:
+        """Generate request headers"""
+        headers = {
+            "Accept": "application/json",
+            "Accept-Language": "it-IT,it;q=0.8,en-US;q=0.5,en;q=0.3",
+            "X-UNIPOL-REQUESTID": str(uuid.uuid4()),
+            "X-UNIPOL-SEQUENCEID": "0",
+            "X-UNIPOL-SESSIONID": self.session_id,
+            "x-ibm-client-id": client_id,
+            "x-ibm-client-secret": client_secret,
+            "X-UNIPOL-CANALE": "WEB",
+            "User-Agent": self.USER_AGENT,
+        }
+        if referer:
+            headers["Referer"] = referer
+        return headers
+
+    def _get_cookies(self) -> Dict[str, str]:
+        """Generate request cookies"""
+        return {
+            "MRHSession": self.mrh_session,
+            "LastMRH_Session": self.last_mrh_session,
+            "isLogged": "true"
+        }
+
+    def _get_cookie_header(self) -> str:
+        """Generate the Cookie header value for the request cookies"""
+        return "; ".join(f"{name}={value}" for name, value in self._get_cookies().items()
+                         if value is not None)
+
+    def _get_login_headers(self) -> Dict[str, str]:
+        """Generate login request headers (login doesn't use client ID/secret)"""
+        return {
+            "Accept": "application/json, text/plain, */*",
+            "Accept-Language": "it-IT,it;q=0.8,en-US;q=0.5,en;q=0.3",
+            "X-UNIPOL-REQUESTID": str(uuid.uuid4()),
+            "X-UNIPOL-SEQUENCEID": "0",
+            "X-UNIPOL-SESSIONID": self.session_id,
+            "Content-Type": "application/x-www-form-urlencoded",
+            "User-Agent": self.USER_AGENT,
+            "Referer": self.LOGIN_REFERER
+        }
+
+    def _store_login_cookies(self, cookies) -> bool:
+        """Keep the session cookies from a login response, if present"""
+        if "MRHSession" in cookies and "LastMRH_Session" in cookies:
+            self.mrh_session = cookies["MRHSession"]
+            self.last_mrh_session = cookies["LastMRH_Session"]
+            self._renewal.cookies = (self.mrh_session, self.last_mrh_session)
+            self._renewal.generation += 1
+            self._session_generation = self._renewal.generation
+            return True
+        return False
+
+    def _session_cache(self, username: str, password: str) -> SessionCache:
+        return SessionCache(self.cache_dir, self.BASE_URL, self.contract_id, username, password)
+
+    def _restore_session(self, session: Dict[str, str]) -> None:
+        """Use session cookies read from the session cache"""
+        self.session_id = session["session_id"]
+        self._store_login_cookies(session)
+
+    # Endpoints requiring the session cookies, and the statuses of an expired session
+    AUTHENTICATED_ENDPOINTS = ("movements", "pdf")
+    AUTH_FAILURE_STATUSES = (401, 403)
+
+    def _adopt_session(self, kwargs: Dict[str, Any]) -> int:
+        """
+        Switch to the latest login of this client or its copies, updating the request
+
+        Returns:
+            Generation of the session the request is sent with
+        """
+        generation = self._renewal.generation
+        if self._renewal.cookies is not None:
+            self.mrh_session, self.last_mrh_session = self._renewal.cookies
+        self._session_generation = generation
+        if "cookies" in kwargs:
+            kwargs["cookies"] = self._get_cookies()
+        headers = kwargs.get("headers")
+        if headers and "Cookie" in headers:
+            headers["Cookie"] = self._get_cookie_header()
+        return generation
+
+    def _movements_params(self, offset: int, limit: int, interval: str,
+                          order_by: str, payment_status: str) -> Dict[str, Any]:
+        return {
+            "offset": offset,
+            "limite": limit,
+            "intervallo": interval,
+            "ordinaPer": order_by,
+            "statoPagamento": payment_status
+        }
+
+    def _cached_pdf(self, movements: List[Dict[str, Any]], intestatario: str,
+                    output_filename: Optional[str]) -> Tuple[Optional[str], Optional[bytes]]:
+        """Cache key of a report and its cached content, if any"""
+        if self.pdf_cache is None:
+            return None, None
+        key = self.pdf_cache.key(self.contract_id, intestatario, movements)
+        content = self.pdf_cache.get(key)
+        if content is not None and output_filename:
+            with open(output_filename, 'wb') as f:
+                f.write(content)
+        return key, content
+
+    def _open_cached_pdf(self, movements: List[Dict[str, Any]],
+                         intestatario: str) -> Tuple[Optional[str], Optional[BinaryIO]]:
+        """Cache key of a report and its cached file opened for reading, if any"""
+        if self.pdf_cache is None:
+            return None, None
+        key = self.pdf_cache.key(self.contract_id, intestatario, movements)
+        return key, self.pdf_cache.open(key)
+
+    def _pdf_batch_client(self, retry_policy: Optional[RetryPolicy]) -> "_BaseClient":
+        client = self.for_contract(self.contract_id)
+        client.retry_policy = retry_policy
+        return client
+
+    def _pdf_split_jobs(self, movements: List[Dict[str, Any]], intestatario: str,
+                        chunk_size: int) -> Tuple["_BaseClient", List[PdfJob]]:
+        """Client and jobs generating the chunks of a split report"""
+        client = self._pdf_batch_client(PDF_BATCH_RETRY_POLICY)
+        # The whole report is cached, not its chunks
+        client.pdf_cache = None
+        return client, [PdfJob(chunk, intestatario)
+                        for chunk in _split_evenly(movements, chunk_size)]
+
+    @staticmethod
+    def _merge_pdf_results(results: List[PdfJobResult]) -> bytes:
+        for result in results:
+            if result.error is not None:
+                raise result.error
+        return _merge_pdfs([result.content for result in results])
+
+    def _decode_movements(self, content: bytes,
+                          fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Decode a movements response, keeping only the given movement fields and
+        converting movements to records if enabled
+        """
+        if fields is None:
+            data = self.json_decoder(content)
+        else:
+            fields = tuple(sorted(set(fields)))
+            if msgspec is not None and self.json_decoder is DEFAULT_JSON_DECODER:
+                data = _projection_decoder(fields).decode(content)
+            else:
+                data = self.json_decoder(content)
+                if data.get("listaMovimenti"):
+                    data["listaMovimenti"] = _project(data["listaMovimenti"], fields)
+        if self.movement_records and data.get("listaMovimenti"):
+            data["listaMovimenti"] = Movement.from_dicts(data["listaMovimenti"])
+        return data
+
+    def _pdf_headers(self, client_id: str, client_secret: str) -> Dict[str, str]:
+        """PDF request headers; the body is sent as a stream of JSON"""
+        headers = self._get_headers(client_id, client_secret, self.MOVEMENTS_REFERER)
+        headers["Content-Type"] = "application/json"
+        return headers
+
+    @staticmethod
+    def _sync_cutoff(store, contract_id: str, lookback: timedelta) -> Optional[datetime]:
+        high_water_mark = store.high_water_mark(contract_id)
+        return high_water_mark - lookback if high_water_mark is not None else None
+
+    @staticmethod
+    def _take_until(movements: List[Dict[str, Any]], cutoff: Optional[datetime],
+                    delta: List[Dict[str, Any]]) -> bool:
+        """Append movements not older than cutoff to delta, True once cutoff is reached"""
+        for movement in movements:
+            movement_datetime = _parse_movement_datetime(movement)
+            if cutoff is not None and movement_datetime is not None and movement_datetime < cutoff:
+                return True
+            delta.append(movement)
+        return False
+
+    def _interval_covering(self, start_date: date) -> str:
+        """
+        Narrowest server interval reaching back to start_date
+
+        Raises:
+            ValueError: If start_date is older than the widest interval reaches back
+        """
+        days_back = (date.today() - start_date).days
+        for interval, days in self.INTERVALS:
+            if days_back <= days:
+                return interval
+        widest, days = self.INTERVALS[-1]
+        raise ValueError(f"start_date {start_date} is older than the widest server interval "
+                         f"({widest}, {days} days) reaches back")
+
+    @staticmethod
+    def _take_between(movements: List[Dict[str, Any]], start_date: date, end_date: date,
+                      result: List[Dict[str, Any]]) -> bool:
+        """Append movements within the range to result, True once older ones are reached"""
+        for movement in movements:
+            movement_datetime = _parse_movement_datetime(movement)
+            if movement_datetime is None:
+                continue
+            movement_date = movement_datetime.date()
+            if movement_date < start_date:
+                return True
+            if movement_date <= end_date:
+                result.append(movement)
+        return False
+
+    def _checkpoint(self, interval: str, batch_size: int,
+                    fields: Optional[Iterable[str]]) -> PaginationCheckpoint:
+        if not self.cache_dir:
+            raise ValueError("Pagination checkpoints require a cache_dir")
+        key = "|".join((self.BASE_URL, self.contract_id, interval, str(batch_size)))
+        if fields is not None:
+            key += "|" + ",".join(sorted(set(fields)))
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        return PaginationCheckpoint(os.path.join(self.cache_dir, "checkpoints",
+                                                 f"movements-{digest}.jsonl"),
+                                    self.contract_id, interval, batch_size, fields)
+
+    def _resume_state(self, checkpoint: Optional[PaginationCheckpoint],
+                      resume_from: Optional[PaginationError]
+                      ) -> Tuple[List[Dict[str, Any]], int, Optional[str]]:
+        """
+        Movements already fetched, offset to fetch from and the hash that page
+        is expected to have (None if it hasn't been fetched yet)
+        """
+        if resume_from is not None:
+            return list(resume_from.movements), resume_from.offset, None
+        if checkpoint is not None:
+            last_offset, last_digest, movements = checkpoint.load()
+            if self.movement_records:
+                # Pages are saved as dictionaries
+                movements = Movement.from_dicts(movements)
+            if last_offset:
+                # Fetch the last saved page again, to check that the history didn't
+                # shift (e.g. new movements) since the checkpoint was written
+                return movements, last_offset, last_digest
+        return [], 1, None
+
+    def filter_movements_by_date(self,
+                                movements: List[Dict[str, Any]],
+                                start_date: date,
+                                end_date: date) -> List[Dict[str, Any]]:
+        """
+        Filter movements by date range
+
+        Args:
+            movements: List of movement dictionaries or Movement records
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+
+        Returns:
+            Filtered list of movements within the date range
+        """
+        filtered_movements = []
+
+        for movement in movements:
+            # If date parsing fails, skip the movement
+            movement_datetime = _parse_movement_datetime(movement)
+            if movement_datetime is not None and \
+                    start_date <= movement_datetime.date() <= end_date:
+                filtered_movements.append(movement)
+
+        return filtered_movements
+
+
+class UnipolMoveClient(_BaseClient):
     """
     Client for Unipol Move API
 
-    Handles authentication, movement fetching, and PDF report generation.
-    """
+    Handles authentication, movement fetching, and PDF report generation.
+    """
+
+    def __init__(self, contract_id: str, mrh_session: Optional[str] = None,
+                 last_mrh_session: Optional[str] = None,
+                 session_id: Optional[str] = None,
+                 http_session: Optional[requests.Session] = None,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 keep_alive: bool = True,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 credentials: Optional[GatewayCredentials] = None,
+                 credentials_ttl: float = CREDENTIALS_TTL,
+                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 rate_limiter: Optional[Union[TokenBucket, RateLimiter]] = None,
+                 concurrency_limiter: Optional[AdaptiveConcurrency] = None,
+                 max_rate_limit_retries: int = 3,
+                 retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+                 credential_provider: Optional[CredentialProvider] = None,
+                 session_cache: bool = False,
+                 pdf_cache: Optional[PdfReportCache] = None,
+                 pdf_latency_model: Optional[PdfLatencyModel] = None,
+                 json_decoder: Optional[JsonDecoder] = None,
+                 movement_records: bool = False):
+        """
+        Initialize the client
+
+        Args:
+            contract_id: Your Unipol Move contract ID (e.g., 'P000000000')
+            mrh_session: MRHSession cookie value (optional if using login())
+            last_mrh_session: LastMRH_Session cookie value (optional if using login())
+            session_id: Optional X-UNIPOL-SESSIONID (will be generated if not provided)
+            http_session: Optional requests.Session to use as transport (shared, not closed
+                          by this client). If None, a pooled session is created.
+            pool_connections: Number of per-host connection pools to cache (default: 10)
+            pool_maxsize: Maximum number of connections kept open per host (default: 10)
+            pool_block: Block when all connections to a host are in use instead of
+                        opening extra, non-pooled ones (default: False)
+            keep_alive: Reuse connections across requests (default: True)
+            timeout: Seconds to wait for the server to connect or send data, None to wait
+                     indefinitely (default: 60.0)
+            credentials: Pre-resolved API gateway credentials. If None, they are fetched
+                         from environment.json on the first API call and cached.
+            credentials_ttl: Seconds cached credentials stay valid (default: 24 hours)
+            cache_dir: Directory for on-disk caches, or None to disable them
+                       (default: ~/.cache/unipolmove)
+            rate_limiter: Optional TokenBucket applied to every request, or RateLimiter
+                          with buckets per endpoint and gateway client id (default: none)
+            concurrency_limiter: Optional AdaptiveConcurrency limiting requests in flight
+            max_rate_limit_retries: Times a request rejected with 429 is replayed after
+                                    waiting for its Retry-After (default: 3)
+            retry_policy: Retries of failed requests, None to disable them
+                          (default: up to 3 attempts of GET requests)
+            credential_provider: Optional callable returning (username, password), used to
+                                 log in again when the session expires (default: none)
+            session_cache: Reuse the session cookies of a previous login with the same
+                           username and contract, kept encrypted in cache_dir
+                           (requires cryptography, default: False)
+            pdf_cache: Optional PdfReportCache reusing the reports already generated for
+                       the same contract, recipient and movements (default: none)
+            pdf_latency_model: PdfLatencyModel sizing the chunks of split PDF reports
+                               (default: a new model with a 15 seconds target)
+            json_decoder: Callable decoding JSON response bodies from bytes
+                          (default: orjson, msgspec or json, whichever is installed)
+            movement_records: Return movements as compact Movement records instead of
+                              dictionaries (default: False)
+        """
+        super().__init__(contract_id, mrh_session, last_mrh_session, session_id,
+                         credentials, credentials_ttl, cache_dir, rate_limiter,
+                         concurrency_limiter, max_rate_limit_retries, retry_policy,
+                         credential_provider, session_cache, pdf_cache,
+                         pdf_latency_model, json_decoder, movement_records)
+        self._owns_transport = http_session is None
+        self.http_session = http_session or _build_session(
+            pool_connections, pool_maxsize, pool_block, keep_alive
+        )
+        self.timeout = timeout
+
+    def _resolve_credentials(self) -> GatewayCredentials:
+        """Get credentials from the process/disk cache or fetch environment.json"""
+        # Holding the lock while fetching lets concurrent clients share one request
+        with _credentials_lock:
+            credentials = _load_cached_credentials(self.BASE_URL, self.credentials_ttl,
+                                                   self.cache_dir)
+            if credentials is None:
+                response = self._request("environment", "GET",
+                                         self.BASE_URL + self.ENV_ENDPOINT)
+                response.raise_for_status()
+                credentials = GatewayCredentials.from_env_config(response.json())
+                _store_credentials(self.BASE_URL, credentials, self.cache_dir)
+            return credentials
+
+    # Errors after which a request may be retried according to the retry policy
+    RETRYABLE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError)
+
+    def _request(self, endpoint: str, method: str, url: str, renew_session: bool = True,
+                 **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session
+
+        Honors the rate and concurrency limiters, replays requests rejected with
+        429 once their Retry-After has elapsed, retries failures according to the
+        retry policy and, unless renew_session is False, renews expired sessions.
+        """
+        bucket = self._rate_bucket(endpoint, kwargs.get("headers"))
+        authenticated = endpoint in self.AUTHENTICATED_ENDPOINTS
+        failures = rate_limits = 0
+        renewed = False
+        while True:
+            if authenticated:
+                # Session the request is sent with, to tell if another one renewed it since
+                generation = self._adopt_session(kwargs)
+            if bucket is not None:
+                bucket.acquire()
+            if self.concurrency_limiter is not None:
+                self.concurrency_limiter.acquire()
+            started = time.monotonic()
+            response = None
+            error = None
+            try:
+                response = self.http_session.request(method, url, timeout=self.timeout,
+                                                     **kwargs)
+            except self.RETRYABLE_ERRORS as e:
+                error = e
+            finally:
+                if self.concurrency_limiter is not None:
+                    self.concurrency_limiter.release(
+                        response.status_code if response is not None else None,
+                        time.monotonic() - started
+                    )
+
+            delay, failures, rate_limits = self._replay_delay(
+                method,
+                response.status_code if response is not None else None,
+                response.headers if response is not None else {},
+                bucket, failures, rate_limits
+            )
+            if delay is None:
+                if error is not None:
+                    raise error
+                if authenticated and renew_session and not renewed \
+                        and self.credential_provider is not None \
+                        and response.status_code in self.AUTH_FAILURE_STATUSES:
+                    renewed = True
+                    if self._renew_session(generation):
+                        response.close()
+                        continue
+                return response
+            if response is not None:
+                # Release the connection of a streamed response before replaying
+                response.close()
+            if delay:
+                time.sleep(delay)
+
+    def _renew_session(self, expired_generation: int) -> bool:
+        """
+        Log in again with the credential provider, unless another request
+        already did since the expired session was used
+
+        Returns:
+            True if a newer session is available
+        """
+        with self._renewal.lock:
+            if self._renewal.generation == expired_generation:
+                username, password = self.credential_provider()
+                self.login(username, password)
+            return self._renewal.generation != expired_generation
+
+    def close(self) -> None:
+        """Close the underlying HTTP session if it is owned by this client"""
+        if self._owns_transport:
+            self.http_session.close()
+
+    def __enter__(self) -> "UnipolMoveClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def login(self, username: str, password: str) -> bool:
+        """
+        Authenticate and obtain session cookies
+
+        Args:
+            username: Your Unipol Move username (email)
+            password: Your Unipol Move password
+
+        Returns:
+            True if login successful, False otherwise
+
+        Raises:
+            requests.exceptions.HTTPError: If login fails
+        """
+        if not self.session_cache:
+            return self._login(username, password)
+
+        cache = self._session_cache(username, password)
+        cache.acquire()
+        try:
+            session = cache.load()
+            if session is not None:
+                self._restore_session(session)
+                if self._session_is_valid():
+                    return True
+            if not self._login(username, password):
+                return False
+            cache.store(self.mrh_session, self.last_mrh_session, self.session_id)
+            return True
+        finally:
+            cache.release()
+
+    def _login(self, username: str, password: str) -> bool:
+        login_url = f"{self.BASE_URL}{self.LOGIN_ENDPOINT}"
+
+        data = {
+            "username": username,
+            "password": password
+        }
+
+        response = self._request("login", "POST", login_url,
+                                 headers=self._get_login_headers(), data=data)
+        response.raise_for_status()
+
+        # Extract cookies from response
+        return self._store_login_cookies(response.cookies)
+
+    def _session_is_valid(self) -> bool:
+        """Check the session cookies with a single-movement request"""
+        response = self._movements_request(1, 1, self.INTERVALS[0][0], "date-D", "0,1,3,4",
+                                           renew_session=False)
+        if response.status_code in self.AUTH_FAILURE_STATUSES:
+            return False
+        response.raise_for_status()
+        return True
+
+    def fetch_movements(self,
+                       offset: int = 1,
+                       limit: int = 100,
+                       interval: str = "ULTIMO_ANNO",
+                       order_by: str = "date-D",
+                       payment_status: str = "0,1,3,4",
+                       fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch toll movements from the API
+
+        Args:
+            offset: Starting offset for pagination (default: 1)
+            limit: Maximum number of records to fetch (default: 100)
+            interval: Time interval (default: 'ULTIMO_ANNO' = last year)
+            order_by: Sorting order (default: 'date-D' = date descending)
+            payment_status: Payment status filter (default: '0,1,3,4')
+                           0=DA_ADDEBITARE, 1=ADDEBITATO, 3=?, 4=?
+            fields: Movement fields to keep, e.g. CORE_FIELDS, discarding the others
+                    while decoding (default: all). Other top-level keys than
+                    'dispositivi' and 'listaMovimenti' may be dropped.
+
+        Returns:
+            Dictionary containing the API response with 'dispositivi' and 'listaMovimenti'
+            (Movement records if the client has movement_records enabled)
+        """
+        response = self._movements_request(offset, limit, interval, order_by, payment_status)
+        response.raise_for_status()
+        return self._decode_movements(response.content, fields)
+
+    def _movements_request(self, offset: int, limit: int, interval: str, order_by: str,
+                           payment_status: str, renew_session: bool = True) -> requests.Response:
+        url = self.BASE_URL + self.MOVEMENTS_ENDPOINT.format(contract_id=self.contract_id)
+
+        return self._request(
+            "movements",
+            "GET",
+            url,
+            renew_session=renew_session,
+            headers=self._get_headers(
+                self.movements_client_id,
+                self.movements_client_secret,
+                self.MOVEMENTS_REFERER
+            ),
+            cookies=self._get_cookies(),
+            params=self._movements_params(offset, limit, interval, order_by, payment_status)
+        )
+
+    def _fetch_page(self, offset: int, batch_size: int, interval: str,
+                    fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        try:
+            return self.fetch_movements(
+                offset=offset,
+                limit=batch_size,
+                interval=interval,
+                fields=fields
+            ).get("listaMovimenti", [])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise PaginationError(offset) from e
+
+    def _iter_pages(self, batch_size: int, interval: str, concurrency: int = 1,
+                    start_offset: int = 1,
+                    fields: Optional[Iterable[str]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield pages of movements in server order
+
+        With concurrency > 1, up to that many pages are requested ahead of the one
+        being consumed; requests past the last page are cancelled or discarded.
+
+        Raises:
+            PaginationError: If a page can't be fetched
+        """
+        if concurrency <= 1:
+            offset = start_offset
+            while True:
+                movements = self._fetch_page(offset, batch_size, interval, fields)
+                if not movements:
+                    return
+                yield movements
+                # If we got fewer results than the batch size, we've reached the end
+                if len(movements) < batch_size:
+                    return
+                offset += batch_size
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        pending = deque()
+        next_offset = start_offset
+        try:
+            for _ in range(concurrency):
+                pending.append(executor.submit(self._fetch_page, next_offset, batch_size,
+                                               interval, fields))
+                next_offset += batch_size
+
+            while pending:
+                movements = pending.popleft().result()
+                if not movements:
+                    return
+                yield movements
+                if len(movements) < batch_size:
+                    return
+                pending.append(executor.submit(self._fetch_page, next_offset, batch_size,
+                                               interval, fields))
+                next_offset += batch_size
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def iter_movements(self,
+                       batch_size: int = 100,
+                       interval: str = "ULTIMO_ANNO",
+                       prefetch: int = 0,
+                       start_offset: int = 1,
+                       fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all toll movements as pages arrive
+
+        Only the pages being consumed or prefetched are held in memory.
+
+        Args:
+            batch_size: Number of records to fetch per request (default: 100)
+            interval: Time interval (default: 'ULTIMO_ANNO')
+            prefetch: Number of pages requested ahead of the one being consumed (default: 0)
+            start_offset: Offset to start from, e.g. PaginationError.offset (default: 1)
+            fields: Movement fields to keep, see fetch_movements (default: all)
+
+        Yields:
+            Movements, in server order
+
+        Raises:
+            PaginationError: If a page can't be fetched
+        """
+        for movements in self._iter_pages(batch_size, interval, prefetch + 1, start_offset,
+                                          fields):
+            yield from movements
+
+    def fetch_all_movements(self,
+                           batch_size: int = 100,
+                           interval: str = "ULTIMO_ANNO",
+                           concurrency: int = 1,
+                           store: Optional[MovementStore] = None,
+                           resume_from: Optional[PaginationError] = None,
+                           checkpoint: bool = False,
+                           fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch all toll movements with automatic pagination
+
+        Args:
+            batch_size: Number of records to fetch per request (default: 100)
+            interval: Time interval (default: 'ULTIMO_ANNO')
+            concurrency: Maximum number of pages requested in parallel (default: 1).
+                         Keep it at or below the client's pool_maxsize.
+            store: Optional movement store to merge the fetched movements into
+            resume_from: PaginationError of an interrupted call with the same arguments,
+                         to continue from its failing offset instead of starting over
+            checkpoint: Save the pages in cache_dir as they arrive, and resume from them
+                        if a previous call with the same arguments was interrupted
+                        (default: False). The saved pages are deleted on completion.
+            fields: Movement fields to keep, e.g. CORE_FIELDS, see fetch_movements
+                    (default: all). Keep IDENTITY_FIELDS when merging into a store.
+
+        Returns:
+            List of all movements, in server order
+
+        Raises:
+            PaginationError: If a page can't be fetched (after retries); it holds the
+                             movements fetched so far and can be passed as resume_from
+        """
+        checkpoint_file = self._checkpoint(interval, batch_size, fields) if checkpoint else None
+        all_movements, offset, expected_digest = self._resume_state(checkpoint_file, resume_from)
+        pages = self._iter_pages(batch_size, interval, concurrency, offset, fields)
+        try:
+            for movements in pages:
+                if expected_digest is not None:
+                    if _page_digest(movements) != expected_digest:
+                        break
+                    expected_digest = None
+                else:
+                    all_movements.extend(movements)
+                    if checkpoint_file is not None:
+                        checkpoint_file.append(offset, movements)
+                offset += batch_size
+        except PaginationError as e:
+            e.movements = all_movements
+            raise
+        finally:
+            pages.close()
+        if checkpoint_file is not None:
+            checkpoint_file.clear()
+            if expected_digest is not None:
+                # The saved pages are stale, start over
+                return self.fetch_all_movements(batch_size, interval, concurrency, store,
+                                                checkpoint=True, fields=fields)
+        if store is not None:
+            store.merge(self.contract_id, all_movements)
+        return all_movements
+
+    def fetch_movements_between(self,
+                                start_date: date,
+                                end_date: date,
+                                batch_size: int = 100,
+                                concurrency: int = 1) -> List[Dict[str, Any]]:
+        """
+        Fetch the movements within a date range, stopping as soon as older ones appear
+
+        Uses the narrowest server interval covering start_date and relies on the
+        'date-D' ordering to stop paginating past the range. Same result as
+        filter_movements_by_date(fetch_all_movements(...), start_date, end_date).
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            batch_size: Number of records to fetch per request (default: 100)
+            concurrency: Maximum number of pages requested in parallel (default: 1)
+
+        Returns:
+            Movements within the date range, in server order
+
+        Raises:
+            ValueError: If start_date is older than any of INTERVALS reaches back
+        """
+        result = []
+        pages = self._iter_pages(batch_size, self._interval_covering(start_date), concurrency)
+        try:
+            for movements in pages:
+                if self._take_between(movements, start_date, end_date, result):
+                    break
+        finally:
+            pages.close()
+        return result
+
+    def sync_movements(self,
+                       store: MovementStore,
+                       interval: str = "ULTIMO_ANNO",
+                       batch_size: int = 100,
+                       lookback: timedelta = timedelta(0)) -> List[Dict[str, Any]]:
+        """
+        Incrementally fetch movements newer than the store's high-water mark
+
+        Pages are read newest first ('date-D' order) and pagination stops at the first
+        movement older than the high-water mark; the delta is merged into the store.
+        The first sync of a contract fetches the whole interval.
+
+        Args:
+            store: Movement store to read the high-water mark from and merge into
+            interval: Time interval (default: 'ULTIMO_ANNO')
+            batch_size: Number of records to fetch per request (default: 100)
+            lookback: Also refetch movements this much older than the high-water mark,
+                      e.g. to pick up payment status changes (default: none)
+
+        Returns:
+            Movements fetched by this sync (new or refreshed)
+        """
+        cutoff = self._sync_cutoff(store, self.contract_id, lookback)
+        delta = []
+        # fetch_movements defaults to 'date-D' ordering, which the cutoff relies on
+        pages = self._iter_pages(batch_size, interval)
+        try:
+            for movements in pages:
+                if self._take_until(movements, cutoff, delta):
+                    break
+        finally:
+            pages.close()
+        store.merge(self.contract_id, delta)
+        return delta
+
+    def generate_pdf_report(self,
+                           movements: List[Dict[str, Any]],
+                           intestatario: str,
+                           output_filename: Optional[str] = None,
+                           split: bool = False,
+                           max_concurrency: int = 4) -> bytes:
+        """
+        Generate PDF expense report for selected movements
+
+        Args:
+            movements: List of movement dictionaries (or Movement records) to include in the report
+            intestatario: Name to display as the report recipient/header
+            output_filename: Optional filename to save the PDF (if None, returns bytes only)
+            split: Generate reports with more movements than pdf_latency_model.chunk_size()
+                   in chunks, merged locally into one document (requires pypdf, default: False)
+            max_concurrency: Maximum number of chunks generated at once when split (default: 4)
 
-    BASE_URL = "https://www.unipolmove.it"
+        Returns:
+            PDF file content as bytes
 
-    # API endpoints
-    ENV_ENDPOINT = '/app/config/environment.json'
-    MOVEMENTS_ENDPOINT = "/api/ut/prv/unipolmove/portale-tlpd/servizi-mobilita/v6/contratti/{contract_id}/movimenti"
-    PDF_ENDPOINT = "/api/us/prv/tpd/telepedaggio-us/post-vendita/v1/contratti/{contract_id}/movimenti/stampa"
-    LOGIN_ENDPOINT = "/login"
+        Raises:
+            requests.exceptions.HTTPError: If PDF generation fails
+        """
+        cache_key, content = self._cached_pdf(movements, intestatario, output_filename)
+        if content is not None:
+            return content
+
+        chunk_size = self.pdf_latency_model.chunk_size()
+        if split and len(movements) > chunk_size:
+            client, jobs = self._pdf_split_jobs(movements, intestatario, chunk_size)
+            content = self._merge_pdf_results(
+                client.generate_pdf_reports(jobs, max_concurrency, client.retry_policy)
+            )
+        else:
+            content = self._post_pdf_report(movements, intestatario)
+
+        # Save to file if filename provided
+        if output_filename:
+            with open(output_filename, 'wb') as f:
+                f.write(content)
+
+        if cache_key is not None:
+            self.pdf_cache.put(cache_key, content)
+        return content
+
+    def _pdf_request(self, movements: List[Dict[str, Any]], intestatario: str,
+                     **kwargs) -> requests.Response:
+        url = self.BASE_URL + self.PDF_ENDPOINT.format(contract_id=self.contract_id)
+
+        return self._request(
+            "pdf",
+            "POST",
+            url,
+            headers=self._pdf_headers(self.pdf_client_id, self.pdf_client_secret),
+            cookies=self._get_cookies(),
+            data=_PdfPayload(movements, intestatario),
+            **kwargs
+        )
+
+    def _post_pdf_report(self, movements: List[Dict[str, Any]], intestatario: str) -> bytes:
+        started = time.monotonic()
+        response = self._pdf_request(movements, intestatario)
+        response.raise_for_status()
+        self.pdf_latency_model.observe(len(movements), time.monotonic() - started)
+        return response.content
+
+    def download_pdf_report(self,
+                            movements: List[Dict[str, Any]],
+                            intestatario: str,
+                            destination: Union[str, "os.PathLike", Any],
+                            chunk_size: int = 64 * 1024) -> PdfReportInfo:
+        """
+        Generate PDF expense report for selected movements, streaming it to disk
+
+        Unlike generate_pdf_report, the PDF is never held in memory as a whole.
+
+        Args:
+            movements: List of movement dictionaries (or Movement records) to include in the report
+            intestatario: Name to display as the report recipient/header
+            destination: Path of the PDF, written through a temporary file renamed once
+                         complete, or a writable binary file object
+            chunk_size: Bytes read from the response (or the cached report) at a time
+                        (default: 64 KiB)
+
+        Returns:
+            PdfReportInfo with the path (None for file objects), size and SHA-256 of the PDF
+
+        Raises:
+            requests.exceptions.HTTPError: If PDF generation fails
+        """
+        download = _PdfDownload(destination)
+        try:
+            cache_key, cached = self._open_cached_pdf(movements, intestatario)
+            if cached is not None:
+                with cached:
+                    shutil.copyfileobj(cached, download, chunk_size)
+            else:
+                started = time.monotonic()
+                with self._pdf_request(movements, intestatario, stream=True) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(chunk_size):
+                        download.write(chunk)
+                self.pdf_latency_model.observe(len(movements), time.monotonic() - started)
+        except BaseException:
+            download.abort()
+            raise
+        info = download.commit()
+
+        if cached is None and cache_key is not None and info.path is not None:
+            self.pdf_cache.put_file(cache_key, info.path)
+        return info
+
+    def generate_pdf_reports(self, jobs: Iterable[PdfJob], max_concurrency: int = 4,
+                             retry_policy: Optional[RetryPolicy] = PDF_BATCH_RETRY_POLICY,
+                             progress: Optional[PdfProgressCallback] = None
+                             ) -> List[PdfJobResult]:
+        """
+        Generate many PDF reports concurrently
+
+        A failing report doesn't stop the others: its error is returned in its result.
+
+        Args:
+            jobs: Reports to generate, as PdfJob (movements, intestatario, output_filename)
+            max_concurrency: Maximum number of reports generated at once (default: 4).
+                             Keep it at or below the client's pool_maxsize.
+            retry_policy: Retries of failed requests (default: up to 3 attempts, POST included)
+            progress: Optional callback called with (done, total, result) after each report
+
+        Returns:
+            List of PdfJobResult, in the order of the jobs
+        """
+        jobs = [PdfJob(*job) for job in jobs]
+        client = self._pdf_batch_client(retry_policy)
+
+        def generate(job: PdfJob) -> PdfJobResult:
+            try:
+                content = client.generate_pdf_report(job.movements, job.intestatario,
+                                                     job.output_filename)
+            except Exception as e:
+                return PdfJobResult(job, None, e)
+            return PdfJobResult(job, content, None)
+
+        results: List[Optional[PdfJobResult]] = [None] * len(jobs)
+        with ThreadPoolExecutor(max_workers=max(max_concurrency, 1)) as executor:
+            futures = {executor.submit(generate, job): index for index, job in enumerate(jobs)}
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results[futures[future]] = result
+                if progress is not None:
+                    progress(done, len(jobs), result)
+        return results
+
+
+class AsyncUnipolMoveClient(_BaseClient):
+    """
+    Asyncio client for Unipol Move API
+
+    Same surface as UnipolMoveClient, with coroutine methods running on a pooled
+    httpx.AsyncClient. Requires the optional 'httpx' dependency.
+    """
 
     def __init__(self, contract_id: str, mrh_session: Optional[str] = None,
                  last_mrh_session: Optional[str] = None,
-                 session_id: Optional[str] = None):
+                 session_id: Optional[str] = None,
+                 http_client: Optional["httpx.AsyncClient"] = None,
+                 max_connections: int = 10,
+                 max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 5.0,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 credentials: Optional[GatewayCredentials] = None,
+                 credentials_ttl: float = CREDENTIALS_TTL,
+                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 rate_limiter: Optional[Union[TokenBucket, RateLimiter]] = None,
+                 concurrency_limiter: Optional[AdaptiveConcurrency] = None,
+                 max_rate_limit_retries: int = 3,
+                 retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+                 credential_provider: Optional[CredentialProvider] = None,
+                 session_cache: bool = False,
+                 pdf_cache: Optional[PdfReportCache] = None,
+                 pdf_latency_model: Optional[PdfLatencyModel] = None,
+                 json_decoder: Optional[JsonDecoder] = None,
+                 movement_records: bool = False):
         """
         Initialize the client
 
@@ -37,44 +3088,171 @@ class UnipolMoveClient:
             mrh_session: MRHSession cookie value (optional if using login())
             last_mrh_session: LastMRH_Session cookie value (optional if using login())
             session_id: Optional X-UNIPOL-SESSIONID (will be generated if not provided)
+            http_client: Optional httpx.AsyncClient to use as transport (shared, not closed
+                         by this client). If None, a pooled client is created.
+            max_connections: Maximum number of concurrent connections (default: 10)
+            max_keepalive_connections: Maximum number of idle connections kept open (default: 10)
+            keepalive_expiry: Seconds an idle connection is kept open (default: 5.0)
+            timeout: Request timeout in seconds, None to wait indefinitely (default: 60.0)
+            credentials: Pre-resolved API gateway credentials. If None, they are fetched
+                         from environment.json on the first API call and cached.
+            credentials_ttl: Seconds cached credentials stay valid (default: 24 hours)
+            cache_dir: Directory for on-disk caches, or None to disable them
+                       (default: ~/.cache/unipolmove)
+            rate_limiter: Optional TokenBucket applied to every request, or RateLimiter
+                          with buckets per endpoint and gateway client id (default: none)
+            concurrency_limiter: Optional AdaptiveConcurrency limiting requests in flight
+            max_rate_limit_retries: Times a request rejected with 429 is replayed after
+                                    waiting for its Retry-After (default: 3)
+            retry_policy: Retries of failed requests, None to disable them
+                          (default: up to 3 attempts of GET requests)
+            credential_provider: Optional callable returning (username, password), or a
+                                 coroutine function, used to log in again when the
+                                 session expires (default: none)
+            session_cache: Reuse the session cookies of a previous login with the same
+                           username and contract, kept encrypted in cache_dir
+                           (requires cryptography, default: False)
+            pdf_cache: Optional PdfReportCache reusing the reports already generated for
+                       the same contract, recipient and movements (default: none)
+            pdf_latency_model: PdfLatencyModel sizing the chunks of split PDF reports
+                               (default: a new model with a 15 seconds target)
+            json_decoder: Callable decoding JSON response bodies from bytes
+                          (default: orjson, msgspec or json, whichever is installed)
+            movement_records: Return movements as compact Movement records instead of
+                              dictionaries (default: False)
+
+        Raises:
+            ImportError: If httpx is not installed
         """
-        self.contract_id = contract_id
-        self.mrh_session = mrh_session
-        self.last_mrh_session = last_mrh_session
-        self.session_id = session_id or str(uuid.uuid4())
-        env_config = requests.get(self.BASE_URL + self.ENV_ENDPOINT).json()
-        self.movements_client_id = env_config['apiConnect']['headers_ut_prv_mobility_service']['x-ibm-client-id']
-        self.movements_client_secret = env_config['apiConnect']['headers_ut_prv_mobility_service']['x-ibm-client-secret']
-        self.pdf_client_id = env_config['apiConnect']['headers_us']['x-ibm-client-id']
-        self.pdf_client_secret = env_config['apiConnect']['headers_us']['x-ibm-client-secret']
+        if httpx is None:
+            raise ImportError("AsyncUnipolMoveClient requires httpx: pip install httpx")
+        super().__init__(contract_id, mrh_session, last_mrh_session, session_id,
+                         credentials, credentials_ttl, cache_dir, rate_limiter,
+                         concurrency_limiter, max_rate_limit_retries, retry_policy,
+                         credential_provider, session_cache, pdf_cache,
+                         pdf_latency_model, json_decoder, movement_records)
+        self._owns_transport = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_keepalive_connections,
+                                keepalive_expiry=keepalive_expiry),
+            timeout=httpx.Timeout(timeout),
+        )
+        self._credentials_lock: Optional[asyncio.Lock] = None
 
-    def _get_headers(self, client_id: str, client_secret: str,
-                     referer: str = None) -> Dict[str, str]:
-        """Generate request headers"""
-        headers = {
-            "Accept": "application/json",
-            "Accept-Language": "it-IT,it;q=0.8,en-US;q=0.5,en;q=0.3",
-            "X-UNIPOL-REQUESTID": str(uuid.uuid4()),
-            "X-UNIPOL-SEQUENCEID": "0",
-            "X-UNIPOL-SESSIONID": self.session_id,
-            "x-ibm-client-id": client_id,
-            "x-ibm-client-secret": client_secret,
-            "X-UNIPOL-CANALE": "WEB",
-            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:144.0) Gecko/20100101 Firefox/144.0",
-        }
-        if referer:
-            headers["Referer"] = referer
-        return headers
+    def _resolve_credentials(self) -> GatewayCredentials:
+        raise RuntimeError("Credentials not resolved yet: await get_credentials() first")
 
-    def _get_cookies(self) -> Dict[str, str]:
-        """Generate request cookies"""
-        return {
-            "MRHSession": self.mrh_session,
-            "LastMRH_Session": self.last_mrh_session,
-            "isLogged": "true"
-        }
+    async def get_credentials(self) -> GatewayCredentials:
+        """Resolve the API gateway credentials from the cache or environment.json"""
+        if self._credentials is not None:
+            return self._credentials
+        if self._credentials_lock is None:
+            self._credentials_lock = asyncio.Lock()
+        async with self._credentials_lock:
+            if self._credentials is None:
+                credentials = _load_cached_credentials(self.BASE_URL, self.credentials_ttl,
+                                                       self.cache_dir)
+                if credentials is None:
+                    response = await self._request("environment", "GET",
+                                                   self.BASE_URL + self.ENV_ENDPOINT)
+                    response.raise_for_status()
+                    credentials = GatewayCredentials.from_env_config(response.json())
+                    _store_credentials(self.BASE_URL, credentials, self.cache_dir)
+                self._credentials = credentials
+        return self._credentials
 
-    def login(self, username: str, password: str) -> bool:
+    # Errors after which a request may be retried according to the retry policy
+    RETRYABLE_ERRORS = (httpx.TransportError,) if httpx is not None else ()
+
+    async def _request(self, endpoint: str, method: str, url: str, renew_session: bool = True,
+                       **kwargs) -> "httpx.Response":
+        """
+        Send a request through the pooled client, see UnipolMoveClient._request
+
+        With stream=True the body isn't read: iterate it with aiter_bytes() and
+        close the response with aclose().
+        """
+        stream = kwargs.pop("stream", False)
+        bucket = self._rate_bucket(endpoint, kwargs.get("headers"))
+        authenticated = endpoint in self.AUTHENTICATED_ENDPOINTS
+        failures = rate_limits = 0
+        renewed = False
+        while True:
+            if authenticated:
+                # Session the request is sent with, to tell if another one renewed it since
+                generation = self._adopt_session(kwargs)
+            if bucket is not None:
+                await bucket.acquire_async()
+            if self.concurrency_limiter is not None:
+                await self.concurrency_limiter.acquire_async()
+            started = time.monotonic()
+            response = None
+            error = None
+            try:
+                if stream:
+                    response = await self.http_client.send(
+                        self.http_client.build_request(method, url, **kwargs), stream=True
+                    )
+                else:
+                    response = await self.http_client.request(method, url, **kwargs)
+            except self.RETRYABLE_ERRORS as e:
+                error = e
+            finally:
+                if self.concurrency_limiter is not None:
+                    await self.concurrency_limiter.release_async(
+                        response.status_code if response is not None else None,
+                        time.monotonic() - started
+                    )
+
+            delay, failures, rate_limits = self._replay_delay(
+                method,
+                response.status_code if response is not None else None,
+                response.headers if response is not None else {},
+                bucket, failures, rate_limits
+            )
+            if delay is None:
+                if error is not None:
+                    raise error
+                if authenticated and renew_session and not renewed \
+                        and self.credential_provider is not None \
+                        and response.status_code in self.AUTH_FAILURE_STATUSES:
+                    renewed = True
+                    if await self._renew_session(generation):
+                        await response.aclose()
+                        continue
+                return response
+            if response is not None:
+                # Release the connection of a streamed response before replaying
+                await response.aclose()
+            if delay:
+                await asyncio.sleep(delay)
+
+    async def _renew_session(self, expired_generation: int) -> bool:
+        """Log in again unless another request already did, see UnipolMoveClient._renew_session"""
+        if self._renewal.async_lock is None:
+            self._renewal.async_lock = asyncio.Lock()
+        async with self._renewal.async_lock:
+            if self._renewal.generation == expired_generation:
+                login = self.credential_provider()
+                if inspect.isawaitable(login):
+                    login = await login
+                username, password = login
+                await self.login(username, password)
+            return self._renewal.generation != expired_generation
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client if it is owned by this client"""
+        if self._owns_transport:
+            await self.http_client.aclose()
+
+    async def __aenter__(self) -> "AsyncUnipolMoveClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def login(self, username: str, password: str) -> bool:
         """
         Authenticate and obtain session cookies
 
@@ -86,209 +3264,473 @@ class UnipolMoveClient:
             True if login successful, False otherwise
 
         Raises:
-            requests.exceptions.HTTPError: If login fails
+            httpx.HTTPStatusError: If login fails
         """
-        login_url = f"{self.BASE_URL}{self.LOGIN_ENDPOINT}"
+        if not self.session_cache:
+            return await self._login(username, password)
 
-        # Login endpoint doesn't use client ID/secret
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "it-IT,it;q=0.8,en-US;q=0.5,en;q=0.3",
-            "X-UNIPOL-REQUESTID": str(uuid.uuid4()),
-            "X-UNIPOL-SEQUENCEID": "0",
-            "X-UNIPOL-SESSIONID": self.session_id,
-            "Content-Type": "application/x-www-form-urlencoded",
-            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:144.0) Gecko/20100101 Firefox/144.0",
-            "Referer": "https://www.unipolmove.it/app/login"
-        }
+        # Key derivation and file locking block, keep them off the event loop
+        loop = asyncio.get_running_loop()
+        cache = await loop.run_in_executor(None, self._session_cache, username, password)
+        await loop.run_in_executor(None, cache.acquire)
+        try:
+            session = await loop.run_in_executor(None, cache.load)
+            if session is not None:
+                self._restore_session(session)
+                if await self._session_is_valid():
+                    return True
+            if not await self._login(username, password):
+                return False
+            await loop.run_in_executor(None, cache.store, self.mrh_session,
+                                       self.last_mrh_session, self.session_id)
+            return True
+        finally:
+            cache.release()
+
+    async def _login(self, username: str, password: str) -> bool:
+        login_url = f"{self.BASE_URL}{self.LOGIN_ENDPOINT}"
 
         data = {
             "username": username,
             "password": password
         }
 
-        response = requests.post(login_url, headers=headers, data=data)
+        response = await self._request("login", "POST", login_url,
+                                       headers=self._get_login_headers(), data=data)
         response.raise_for_status()
 
-        # Extract cookies from response
-        cookies = response.cookies
-        if "MRHSession" in cookies and "LastMRH_Session" in cookies:
-            self.mrh_session = cookies["MRHSession"]
-            self.last_mrh_session = cookies["LastMRH_Session"]
-            return True
-        else:
+        return self._store_login_cookies(response.cookies)
+
+    async def _session_is_valid(self) -> bool:
+        """Check the session cookies with a single-movement request"""
+        response = await self._movements_request(1, 1, self.INTERVALS[0][0], "date-D",
+                                                 "0,1,3,4", renew_session=False)
+        if response.status_code in self.AUTH_FAILURE_STATUSES:
             return False
+        response.raise_for_status()
+        return True
 
-    def fetch_movements(self,
-                       offset: int = 1,
-                       limit: int = 100,
-                       interval: str = "ULTIMO_ANNO",
-                       order_by: str = "date-D",
-                       payment_status: str = "0,1,3,4") -> Dict[str, Any]:
+    async def fetch_movements(self,
+                              offset: int = 1,
+                              limit: int = 100,
+                              interval: str = "ULTIMO_ANNO",
+                              order_by: str = "date-D",
+                              payment_status: str = "0,1,3,4",
+                              fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
         Fetch toll movements from the API
 
-        Args:
-            offset: Starting offset for pagination (default: 1)
-            limit: Maximum number of records to fetch (default: 100)
-            interval: Time interval (default: 'ULTIMO_ANNO' = last year)
-            order_by: Sorting order (default: 'date-D' = date descending)
-            payment_status: Payment status filter (default: '0,1,3,4')
-                           0=DA_ADDEBITARE, 1=ADDEBITATO, 3=?, 4=?
+        See UnipolMoveClient.fetch_movements for the arguments.
 
         Returns:
             Dictionary containing the API response with 'dispositivi' and 'listaMovimenti'
         """
+        response = await self._movements_request(offset, limit, interval, order_by,
+                                                 payment_status)
+        response.raise_for_status()
+        return self._decode_movements(response.content, fields)
+
+    async def _movements_request(self, offset: int, limit: int, interval: str, order_by: str,
+                                 payment_status: str,
+                                 renew_session: bool = True) -> "httpx.Response":
+        credentials = await self.get_credentials()
         url = self.BASE_URL + self.MOVEMENTS_ENDPOINT.format(contract_id=self.contract_id)
 
-        params = {
-            "offset": offset,
-            "limite": limit,
-            "intervallo": interval,
-            "ordinaPer": order_by,
-            "statoPagamento": payment_status
-        }
+        headers = self._get_headers(
+            credentials.movements_client_id,
+            credentials.movements_client_secret,
+            self.MOVEMENTS_REFERER
+        )
+        headers["Cookie"] = self._get_cookie_header()
 
-        response = requests.get(
+        return await self._request(
+            "movements",
+            "GET",
             url,
-            headers=self._get_headers(
-                self.movements_client_id,
-                self.movements_client_secret,
-                "https://www.unipolmove.it/app/post-vendita/homepage/movements"
-            ),
-            cookies=self._get_cookies(),
-            params=params
+            renew_session=renew_session,
+            headers=headers,
+            params=self._movements_params(offset, limit, interval, order_by, payment_status)
         )
 
-        response.raise_for_status()
-        return response.json()
+    async def _fetch_page(self, offset: int, batch_size: int, interval: str,
+                          fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        try:
+            response = await self.fetch_movements(
+                offset=offset,
+                limit=batch_size,
+                interval=interval,
+                fields=fields
+            )
+        except (httpx.HTTPError, ValueError) as e:
+            raise PaginationError(offset) from e
+        return response.get("listaMovimenti", [])
 
-    def fetch_all_movements(self,
-                           batch_size: int = 100,
-                           interval: str = "ULTIMO_ANNO") -> List[Dict[str, Any]]:
-        """
-        Fetch all toll movements with automatic pagination
+    async def _aiter_pages(self, batch_size: int, interval: str, concurrency: int = 1,
+                           start_offset: int = 1, fields: Optional[Iterable[str]] = None
+                           ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield pages of movements in server order, see UnipolMoveClient._iter_pages"""
+        concurrency = max(concurrency, 1)
+        pending = deque()
+        next_offset = start_offset
+        try:
+            for _ in range(concurrency):
+                pending.append(asyncio.ensure_future(
+                    self._fetch_page(next_offset, batch_size, interval, fields)))
+                next_offset += batch_size
 
-        Args:
-            batch_size: Number of records to fetch per request (default: 100)
-            interval: Time interval (default: 'ULTIMO_ANNO')
+            while pending:
+                movements = await pending.popleft()
+                if not movements:
+                    return
+                yield movements
+                # If we got fewer results than the batch size, we've reached the end
+                if len(movements) < batch_size:
+                    return
+                pending.append(asyncio.ensure_future(
+                    self._fetch_page(next_offset, batch_size, interval, fields)))
+                next_offset += batch_size
+        finally:
+            for task in pending:
+                task.cancel()
 
-        Returns:
-            List of all movements
+    async def iter_movements(self,
+                             batch_size: int = 100,
+                             interval: str = "ULTIMO_ANNO",
+                             prefetch: int = 0,
+                             start_offset: int = 1,
+                             fields: Optional[Iterable[str]] = None
+                             ) -> AsyncIterator[Dict[str, Any]]:
         """
-        all_movements = []
-        offset = 1
+        Iterate over all toll movements as pages arrive
 
-        while True:
-            response = self.fetch_movements(
-                offset=offset,
-                limit=batch_size,
-                interval=interval
-            )
+        See UnipolMoveClient.iter_movements.
+        """
+        async for movements in self._aiter_pages(batch_size, interval, prefetch + 1,
+                                                 start_offset, fields):
+            for movement in movements:
+                yield movement
 
-            movements = response.get("listaMovimenti", [])
+    async def fetch_all_movements(self,
+                                  batch_size: int = 100,
+                                  interval: str = "ULTIMO_ANNO",
+                                  concurrency: int = 1,
+                                  store: Optional[MovementStore] = None,
+                                  resume_from: Optional[PaginationError] = None,
+                                  checkpoint: bool = False,
+                                  fields: Optional[Iterable[str]] = None
+                                  ) -> List[Dict[str, Any]]:
+        """
+        Fetch all toll movements with automatic pagination
 
-            if not movements:
-                break
+        See UnipolMoveClient.fetch_all_movements.
+        """
+        checkpoint_file = self._checkpoint(interval, batch_size, fields) if checkpoint else None
+        all_movements, offset, expected_digest = self._resume_state(checkpoint_file, resume_from)
+        pages = self._aiter_pages(batch_size, interval, concurrency, offset, fields)
+        try:
+            async for movements in pages:
+                if expected_digest is not None:
+                    if _page_digest(movements) != expected_digest:
+                        break
+                    expected_digest = None
+                else:
+                    all_movements.extend(movements)
+                    if checkpoint_file is not None:
+                        checkpoint_file.append(offset, movements)
+                offset += batch_size
+        except PaginationError as e:
+            e.movements = all_movements
+            raise
+        finally:
+            await pages.aclose()
+        if checkpoint_file is not None:
+            checkpoint_file.clear()
+            if expected_digest is not None:
+                # The saved pages are stale, start over
+                return await self.fetch_all_movements(batch_size, interval, concurrency,
+                                                      store, checkpoint=True, fields=fields)
+        if store is not None:
+            store.merge(self.contract_id, all_movements)
+        return all_movements
 
-            all_movements.extend(movements)
+    async def fetch_movements_between(self,
+                                      start_date: date,
+                                      end_date: date,
+                                      batch_size: int = 100,
+                                      concurrency: int = 1) -> List[Dict[str, Any]]:
+        """
+        Fetch the movements within a date range, stopping as soon as older ones appear
 
-            # If we got fewer results than the batch size, we've reached the end
-            if len(movements) < batch_size:
-                break
+        See UnipolMoveClient.fetch_movements_between.
+        """
+        result = []
+        pages = self._aiter_pages(batch_size, self._interval_covering(start_date), concurrency)
+        try:
+            async for movements in pages:
+                if self._take_between(movements, start_date, end_date, result):
+                    break
+        finally:
+            await pages.aclose()
+        return result
 
-            offset += batch_size
+    async def sync_movements(self,
+                             store: MovementStore,
+                             interval: str = "ULTIMO_ANNO",
+                             batch_size: int = 100,
+                             lookback: timedelta = timedelta(0)) -> List[Dict[str, Any]]:
+        """
+        Incrementally fetch movements newer than the store's high-water mark
 
-        return all_movements
+        See UnipolMoveClient.sync_movements.
+        """
+        cutoff = self._sync_cutoff(store, self.contract_id, lookback)
+        delta = []
+        pages = self._aiter_pages(batch_size, interval)
+        try:
+            async for movements in pages:
+                if self._take_until(movements, cutoff, delta):
+                    break
+        finally:
+            await pages.aclose()
+        store.merge(self.contract_id, delta)
+        return delta
 
-    def generate_pdf_report(self,
-                           movements: List[Dict[str, Any]],
-                           intestatario: str,
-                           output_filename: Optional[str] = None) -> bytes:
+    async def generate_pdf_report(self,
+                                  movements: List[Dict[str, Any]],
+                                  intestatario: str,
+                                  output_filename: Optional[str] = None,
+                                  split: bool = False,
+                                  max_concurrency: int = 4) -> bytes:
         """
         Generate PDF expense report for selected movements
 
-        Args:
-            movements: List of movement dictionaries to include in the report
-            intestatario: Name to display as the report recipient/header
-            output_filename: Optional filename to save the PDF (if None, returns bytes only)
+        See UnipolMoveClient.generate_pdf_report for the arguments.
 
         Returns:
             PDF file content as bytes
 
         Raises:
-            requests.exceptions.HTTPError: If PDF generation fails
+            httpx.HTTPStatusError: If PDF generation fails
         """
+        cache_key, content = self._cached_pdf(movements, intestatario, output_filename)
+        if content is not None:
+            return content
+
+        chunk_size = self.pdf_latency_model.chunk_size()
+        if split and len(movements) > chunk_size:
+            client, jobs = self._pdf_split_jobs(movements, intestatario, chunk_size)
+            content = self._merge_pdf_results(
+                await client.generate_pdf_reports(jobs, max_concurrency, client.retry_policy)
+            )
+        else:
+            content = await self._post_pdf_report(movements, intestatario)
+
+        if output_filename:
+            with open(output_filename, 'wb') as f:
+                f.write(content)
+
+        if cache_key is not None:
+            self.pdf_cache.put(cache_key, content)
+        return content
+
+    async def _pdf_request(self, movements: List[Dict[str, Any]], intestatario: str,
+                           **kwargs) -> "httpx.Response":
+        credentials = await self.get_credentials()
         url = self.BASE_URL + self.PDF_ENDPOINT.format(contract_id=self.contract_id)
 
-        # Add 'checked: true' and 'id' fields to movements for the API
-        movements_with_check = []
-        for idx, movement in enumerate(movements):
-            movement_copy = movement.copy()
-            movement_copy['checked'] = True
-            movement_copy['id'] = str(idx)
-            movements_with_check.append(movement_copy)
-
-        payload = {
-            "intestatario": intestatario,
-            "listaMovimenti": movements_with_check
-        }
+        headers = self._pdf_headers(credentials.pdf_client_id, credentials.pdf_client_secret)
+        headers["Cookie"] = self._get_cookie_header()
 
-        response = requests.post(
+        return await self._request(
+            "pdf",
+            "POST",
             url,
-            headers=self._get_headers(
-                self.pdf_client_id,
-                self.pdf_client_secret,
-                "https://www.unipolmove.it/app/post-vendita/homepage/movements"
-            ),
-            cookies=self._get_cookies(),
-            json=payload
+            headers=headers,
+            content=_AsyncPdfPayload(_PdfPayload(movements, intestatario)),
+            **kwargs
         )
 
+    async def _post_pdf_report(self, movements: List[Dict[str, Any]],
+                               intestatario: str) -> bytes:
+        started = time.monotonic()
+        response = await self._pdf_request(movements, intestatario)
         response.raise_for_status()
+        self.pdf_latency_model.observe(len(movements), time.monotonic() - started)
+        return response.content
 
-        # Save to file if filename provided
-        if output_filename:
-            with open(output_filename, 'wb') as f:
-                f.write(response.content)
+    async def download_pdf_report(self,
+                                  movements: List[Dict[str, Any]],
+                                  intestatario: str,
+                                  destination: Union[str, "os.PathLike", Any],
+                                  chunk_size: int = 64 * 1024) -> PdfReportInfo:
+        """
+        Generate PDF expense report for selected movements, streaming it to disk
 
-        return response.content
+        See UnipolMoveClient.download_pdf_report.
+        """
+        download = _PdfDownload(destination)
+        try:
+            cache_key, cached = self._open_cached_pdf(movements, intestatario)
+            if cached is not None:
+                with cached:
+                    shutil.copyfileobj(cached, download, chunk_size)
+            else:
+                started = time.monotonic()
+                response = await self._pdf_request(movements, intestatario, stream=True)
+                try:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        download.write(chunk)
+                finally:
+                    await response.aclose()
+                self.pdf_latency_model.observe(len(movements), time.monotonic() - started)
+        except BaseException:
+            download.abort()
+            raise
+        info = download.commit()
 
-    def filter_movements_by_date(self,
-                                movements: List[Dict[str, Any]],
-                                start_date: date,
-                                end_date: date) -> List[Dict[str, Any]]:
+        if cached is None and cache_key is not None and info.path is not None:
+            self.pdf_cache.put_file(cache_key, info.path)
+        return info
+
+    async def generate_pdf_reports(self, jobs: Iterable[PdfJob], max_concurrency: int = 4,
+                                   retry_policy: Optional[RetryPolicy] = PDF_BATCH_RETRY_POLICY,
+                                   progress: Optional[PdfProgressCallback] = None
+                                   ) -> List[PdfJobResult]:
         """
-        Filter movements by date range
+        Generate many PDF reports concurrently
+
+        See UnipolMoveClient.generate_pdf_reports.
+        """
+        jobs = [PdfJob(*job) for job in jobs]
+        client = self._pdf_batch_client(retry_policy)
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+        done = 0
+
+        async def generate(job: PdfJob) -> PdfJobResult:
+            nonlocal done
+            async with semaphore:
+                try:
+                    content = await client.generate_pdf_report(job.movements, job.intestatario,
+                                                               job.output_filename)
+                    result = PdfJobResult(job, content, None)
+                except Exception as e:
+                    result = PdfJobResult(job, None, e)
+            done += 1
+            if progress is not None:
+                progress(done, len(jobs), result)
+            return result
+
+        return list(await asyncio.gather(*(generate(job) for job in jobs)))
+
+
+class FleetResult(NamedTuple):
+    """Outcome of fetching the movements of one contract of a fleet"""
 
+    contract_id: str
+    movements: Optional[List[Dict[str, Any]]]
+    error: Optional[Exception]
+
+
+class FleetFetcher:
+    """
+    Fetch the movements of many contracts concurrently
+
+    Contract clients are derived from one logged-in client with for_contract(), so
+    they share its login, credentials and connection pool. Requests of the whole
+    fleet go through one token bucket when requests_per_second is set.
+    """
+
+    def __init__(self, client: UnipolMoveClient, contract_ids: List[str],
+                 max_concurrency: int = 8,
+                 requests_per_second: Optional[float] = None,
+                 burst: Optional[float] = None):
+        """
         Args:
-            movements: List of movement dictionaries
-            start_date: Start date (inclusive)
-            end_date: End date (inclusive)
+            client: Logged-in client; its pool_maxsize should be at least max_concurrency
+            contract_ids: Contracts to fetch
+            max_concurrency: Maximum number of contracts fetched at once (default: 8)
+            requests_per_second: Global request rate limit, None for no limit (default: None)
+            burst: Requests allowed at once by the rate limit (default: max(rate, 1))
+        """
+        self.client = client
+        self.contract_ids = list(contract_ids)
+        self.max_concurrency = max_concurrency
+        if requests_per_second is not None:
+            client = copy.copy(client)
+            client.rate_limiter = TokenBucket(requests_per_second, burst)
+        self.clients = {contract_id: client.for_contract(contract_id)
+                        for contract_id in self.contract_ids}
+
+    def _fetch(self, contract_id: str, batch_size: int, interval: str) -> FleetResult:
+        try:
+            movements = self.clients[contract_id].fetch_all_movements(
+                batch_size=batch_size, interval=interval
+            )
+        except Exception as e:
+            return FleetResult(contract_id, None, e)
+        return FleetResult(contract_id, movements, None)
+
+    def fetch_all_movements(self, batch_size: int = 100,
+                            interval: str = "ULTIMO_ANNO") -> Dict[str, FleetResult]:
+        """
+        Fetch all movements of every contract
+
+        Args:
+            batch_size: Number of records to fetch per request (default: 100)
+            interval: Time interval (default: 'ULTIMO_ANNO')
 
         Returns:
-            Filtered list of movements within the date range
+            Dictionary mapping each contract ID to its FleetResult (movements or error)
         """
-        filtered_movements = []
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            results = executor.map(lambda contract_id: self._fetch(contract_id, batch_size,
+                                                                   interval),
+                                   self.contract_ids)
+            return {result.contract_id: result for result in results}
 
-        for movement in movements:
-            # Try dataIngresso first, fallback to dataUscita
-            movement_date_str = movement.get("dataIngresso") or movement.get("dataUscita", "")
-            if movement_date_str:
-                try:
-                    # Handle various date formats
-                    if "T" in movement_date_str:
-                        movement_date = datetime.fromisoformat(
-                            movement_date_str.replace("Z", "+00:00")
-                        ).date()
-                    else:
-                        movement_date = datetime.strptime(movement_date_str, "%Y-%m-%d").date()
-
-                    # Check if movement is within date range
-                    if start_date <= movement_date <= end_date:
-                        filtered_movements.append(movement)
-                except (ValueError, AttributeError):
-                    # If date parsing fails, skip the movement
-                    pass
 
-        return filtered_movements
+class AsyncFleetFetcher:
+    """
+    Fetch the movements of many contracts concurrently from an event loop
+
+    See FleetFetcher.
+    """
+
+    def __init__(self, client: AsyncUnipolMoveClient, contract_ids: List[str],
+                 max_concurrency: int = 8,
+                 requests_per_second: Optional[float] = None,
+                 burst: Optional[float] = None):
+        self.client = client
+        self.contract_ids = list(contract_ids)
+        self.max_concurrency = max_concurrency
+        if requests_per_second is not None:
+            client = copy.copy(client)
+            client.rate_limiter = TokenBucket(requests_per_second, burst)
+        self.clients = {contract_id: client.for_contract(contract_id)
+                        for contract_id in self.contract_ids}
+
+    async def _fetch(self, semaphore: asyncio.Semaphore, contract_id: str, batch_size: int,
+                     interval: str) -> FleetResult:
+        async with semaphore:
+            try:
+                movements = await self.clients[contract_id].fetch_all_movements(
+                    batch_size=batch_size, interval=interval
+                )
+            except Exception as e:
+                return FleetResult(contract_id, None, e)
+            return FleetResult(contract_id, movements, None)
+
+    async def fetch_all_movements(self, batch_size: int = 100,
+                                  interval: str = "ULTIMO_ANNO") -> Dict[str, FleetResult]:
+        """
+        Fetch all movements of every contract
+
+        See FleetFetcher.fetch_all_movements.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*(
+            self._fetch(semaphore, contract_id, batch_size, interval)
+            for contract_id in self.contract_ids
+        ))
+        return {result.contract_id: result for result in results}